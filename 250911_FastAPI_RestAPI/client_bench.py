@@ -0,0 +1,129 @@
+# client_bench.py
+# main.py 에 브라우저처럼 CORS 요청을 보내서 연결 재사용 / preflight 캐시 효과를 재는 도구
+#
+# 사용법:
+#   python client_bench.py                       # main:app 을 직접 띄워서 측정
+#   python client_bench.py --url http://127.0.0.1:8000 --requests 5000 --concurrency 50
+#   python client_bench.py --http2 --url https://...   # HTTP/2 (h2 설치 + TLS 서버 필요)
+#
+# 측정 방식
+#   fresh : 요청마다 새 연결, preflight 도 매번 보냄 (Max-Age 가 없던 상황)
+#   pooled: 연결 풀(keep-alive)을 재사용하고, Access-Control-Max-Age 동안 preflight 결과를 재사용
+#   http2 : pooled 와 같지만 HTTP/2 로 한 연결에 여러 요청을 동시에 보냄 (--http2)
+#
+# X-Client 헤더를 붙여서 브라우저라면 preflight(OPTIONS)가 필요한 요청을 흉내 냅니다.
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ORIGIN = "http://localhost:5500"
+PATH = "/items/5"
+
+
+class PreflightCache:
+    """브라우저의 preflight 캐시 흉내 ((origin, method, url) → 만료 시각)"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._expires = {}
+        self.sent = 0
+
+    async def ensure(self, client: httpx.AsyncClient, url: str):
+        key = (ORIGIN, "GET", url)
+        if self.enabled and self._expires.get(key, 0) > time.monotonic():
+            return
+        self.sent += 1
+        response = await client.options(url, headers={
+            "Origin": ORIGIN,
+            "Access-Control-Request-Method": "GET",
+            "Access-Control-Request-Headers": "x-client",
+        })
+        response.raise_for_status()
+        max_age = int(response.headers.get("access-control-max-age", "5"))  # 브라우저 기본값 5초
+        self._expires[key] = time.monotonic() + max_age
+
+
+async def run(mode: str, base_url: str, total: int, concurrency: int) -> dict:
+    preflight = PreflightCache(enabled=mode != "fresh")
+    semaphore = asyncio.Semaphore(concurrency)
+    url = base_url + PATH
+    versions = set()
+    # fresh 는 keep-alive 연결을 하나도 남기지 않아서 요청마다 새 TCP 연결을 맺음
+    keepalive = 0 if mode == "fresh" else concurrency
+    client = httpx.AsyncClient(http2=(mode == "http2"),
+                               limits=httpx.Limits(max_connections=concurrency,
+                                                   max_keepalive_connections=keepalive))
+
+    async def one():
+        async with semaphore:
+            await preflight.ensure(client, url)
+            response = await client.get(url, headers={"Origin": ORIGIN, "X-Client": "bench"})
+            response.raise_for_status()
+            versions.add(response.http_version)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(one() for _ in range(total)))
+    finally:
+        await client.aclose()
+    elapsed = time.perf_counter() - start
+    return {"mode": mode, "rps": total / elapsed, "preflights": preflight.sent,
+            "seconds": elapsed, "http": ",".join(sorted(versions))}
+
+
+def _start_server() -> tuple:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--no-access-log", "--log-level", "warning"],
+        cwd=Path(__file__).resolve().parent, env=os.environ,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(base_url + PATH)
+            return server, base_url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.terminate()
+    raise SystemExit("main:app 서버를 시작하지 못했습니다")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="keep-alive / preflight 캐시 벤치마크")
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (없으면 main:app 을 직접 띄움)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--http2", action="store_true", help="HTTP/2 모드도 측정 (pip install 'httpx[http2]')")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = _start_server()
+
+    modes = ["fresh", "pooled"] + (["http2"] if args.http2 else [])
+    try:
+        print(f"{'mode':<8}{'req/s':>10}{'preflight':>11}{'seconds':>10}  http")
+        for mode in modes:
+            result = asyncio.run(run(mode, base_url, args.requests, args.concurrency))
+            print(f"{result['mode']:<8}{result['rps']:>10.0f}{result['preflights']:>11}"
+                  f"{result['seconds']:>10.2f}  {result['http']}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
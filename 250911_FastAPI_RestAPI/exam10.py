@@ -1,12 +1,14 @@
 #exam10.py
 
 from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
 from typing import Optional
 from sqlalchemy import Column, Integer, String, Float, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from fastapi import Depends
+from job_queue import JobQueue
+from fast_validation import to_orm
 
 # SQLite 연결
 DATABASE_URL = "sqlite:///./fridge.db"
@@ -27,6 +29,12 @@ class ItemModel(Base):
     price = Column(Float)
     tax = Column(Float, nullable=True)
 
+# 저장을 끝낸 작업 id (작업이 다시 실행되어도 같은 행을 두 번 넣지 않도록, items 테이블은 그대로 둠)
+class SavedJobModel(Base):
+    __tablename__ = "saved_jobs"
+    job_id = Column(String, primary_key=True)
+
+Base.metadata.create_all(bind=engine)
 
 
 # Pydantic 모델
@@ -36,20 +44,39 @@ class Item(BaseModel):
     price: float
     tax: Optional[float] = None
 
-app = FastAPI(title="🍳 냉장고 속 음식 관리 API")
-
-# DB 세션 의존성
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@app.post('/items', status_code=201)        
-async def create_item(item:Item, db=Depends(get_db)):
-  db_item = ItemModel(**item.model_dump())
-  db.add(db_item)
-  db.commit()
-  db.refresh(db_item)
-  return item
\ No newline at end of file
+# DB 저장은 응답을 보낸 뒤 작업 큐에서 처리 (jobs.db 에 기록되어 재시작해도 이어서 실행)
+jobs = JobQueue(concurrency=1, db_path="./jobs.db")
+
+@jobs.task("save_item")
+def save_item(data: dict, job_id: str):
+  db = SessionLocal()
+  try:
+    # 재시작으로 같은 작업이 다시 실행된 경우에는 이미 저장된 행을 그대로 둠
+    if db.get(SavedJobModel, job_id) is None:
+      # data 는 이미 검증된 Item 의 필드 값이므로 다시 검증하지 않고(model_construct) 행으로 옮김
+      db.add(to_orm(Item.model_construct(**data), ItemModel))
+      db.add(SavedJobModel(job_id=job_id))  # 행과 같은 트랜잭션으로 커밋
+      db.commit()
+  finally:
+    db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  await jobs.start()
+  yield
+  await jobs.stop()
+
+app = FastAPI(title="🍳 냉장고 속 음식 관리 API", lifespan=lifespan)
+
+@app.post('/items', status_code=202)        
+async def create_item(item:Item):
+  # 작업 인자는 jobs.db 에 JSON 으로 저장되므로 dict 로 넘김
+  job_id = await jobs.enqueue("save_item", item.model_dump())
+  return {"job_id": job_id, "status_url": f"/jobs/{job_id}", "item": item}
+
+@app.get('/jobs/{job_id}')
+async def get_job(job_id: str):
+  job = await jobs.status(job_id)
+  if job is None:
+    raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+  return job
\ No newline at end of file
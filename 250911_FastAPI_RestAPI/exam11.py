@@ -1,43 +1,77 @@
 from typing import Dict, Annotated
-from fastapi import FastAPI, Form
-from transformers import pipeline
+from fastapi import FastAPI, Form, Request, WebSocket
 from contextlib import asynccontextmanager
 from fastapi.responses import HTMLResponse
+from pathlib import Path
+from page_assets import PageAssets
+from single_flight import SingleFlight
+from access_log import AccessLogMiddleware, StructuredLogger
+from readiness import BackgroundLoader, readiness_response
+from stream_inference import MicroBatcher, serve_inference_socket
 
 # 허깅페이스 텍스트 감정분석 모델로 추론 서비스하기
 
-classifier = None
+log = StructuredLogger()
+
+def load_classifier():
+  # transformers(+torch) import 는 몇 초씩 걸리므로 모듈 맨 위가 아니라 여기서 합니다
+  from transformers import pipeline
+  model = pipeline("sentiment-analysis")
+  log.info("model_loaded", task="sentiment-analysis", model=model.model.name_or_path)
+  return model
+
+# 서버는 바로 요청을 받고, 모델은 백그라운드에서 불러옵니다 (준비 전 /predict 는 503)
+classifier = BackgroundLoader(load_classifier, name="sentiment-analysis")
 
 @asynccontextmanager
 async def startup(app: FastAPI):
-  global classifier 
-  classifier = pipeline("sentiment-analysis")
-  print(classifier)
+  classifier.start()
   yield
+  classifier.clear()
 
 
 app = FastAPI(lifespan=startup)
+app.add_middleware(AccessLogMiddleware, logger=log)
+
+# /class 페이지는 시작할 때 한 번만 읽고 압축해 둡니다
+pages = PageAssets(Path(__file__).resolve().parent / "templates")
+pages.add("class", "exam11_class.html")
+
+# 같은 문장이 동시에 여러 번 들어오면 모델은 한 번만 실행합니다
+predictions = SingleFlight(max_wait=10)
+
+def run_classifier(texts: list):
+  # 파이프라인에 리스트를 넘기면 한 번에(batch) 추론합니다
+  # 모델 최대 길이를 넘는 문장은 잘라서 추론 (긴 문장 하나 때문에 오류가 나지 않도록)
+  return classifier.get()(texts, batch_size=len(texts), truncation=True)
+
+# HTTP 와 웹소켓 요청을 함께 모아서 최대 32개씩 추론 (첫 요청 후 5ms 까지 기다림)
+batcher = MicroBatcher(run_classifier, max_batch=32, max_delay=0.005)
+
+async def classify(content: str):
+  classifier.get()  # 모델 준비 전이면 503
+  return await predictions.run(("predict", content), batcher.submit, content)
 
 @app.post("/predict", response_model = Dict)
-def predict(content: Annotated[str, Form()]):
-  result = classifier(content)
-  return result[0]
-
-@app.get("/class/")
-async def main():
-  content = """
-      <!DOCTYPE html> 
-      <html>
-        <head>
-        <meta charset="UTF-8">
-        <title>FastAPI+HuggingFace</title>
-      </head>
-      <body>
-        <h1>허깅페이스 모델을 활용한 sentiment-analysis 테스트</h1><hr>
-        <form action="/predict" method="post">
-        <input name="content" type="text" size="50" placeholder="분석을 원하는 글을 입력하세요"><br>
-        <input type="submit" value="요청">
-        </form>
-      </body>
-    """
-  return HTMLResponse(content=content)
+async def predict(content: Annotated[str, Form()]):
+  return await classify(content)
+
+@app.websocket("/ws/predict")
+async def predict_ws(websocket: WebSocket):
+  # {"id": ..., "content": "문장"} 을 계속 보내면 끝나는 순서대로 {"id": ..., "result": {...}} 로 답합니다
+  # 소켓 하나당 동시에 처리하는 문장은 64개까지 (넘으면 다음 메시지를 읽지 않고 기다림)
+  await serve_inference_socket(websocket, classify, max_in_flight=64)
+
+@app.get("/healthz")
+async def healthz():
+  # 살아 있는지만 확인 (모델 준비 여부와 무관)
+  return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+  # 모델까지 준비되었는지 확인 (준비 전에는 503)
+  return readiness_response(classifier)
+
+@app.get("/class/", response_class=HTMLResponse)
+async def main(request: Request):
+  return pages.response("class", request)
@@ -1,53 +1,136 @@
 from fastapi.responses import HTMLResponse
-from fastapi import FastAPI, Form
-from transformers import pipeline
+from fastapi import Depends, FastAPI, Form, Header, HTTPException, Request
 from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
-from typing import Annotated
+from typing import Annotated, Literal, Optional
+import os
+import secrets
+from pathlib import Path
+from page_assets import PageAssets
+from single_flight import SingleFlight
+from access_log import AccessLogMiddleware, StructuredLogger
+from readiness import BackgroundLoader, readiness_response
+from model_registry import ModelRegistry
 
-ml_model = {}
+# 이미지 같은 정적 파일 요청은 10%만 접속 로그를 남깁니다
+log = StructuredLogger(sample={"/static/": 0.1})
+
+# transformers(+torch) import 는 몇 초씩 걸리므로 모듈 맨 위가 아니라 모델을 만들 때 합니다
+# version 은 허깅페이스 모델 이름이고, /admin/models/{name}/swap 으로 다른 모델로 바꿀 수 있습니다
+def translation_pipeline(version: str):
+  from transformers import pipeline
+  return pipeline("translation", model=version)
+
+def sentiment_pipeline(version: str):
+  from transformers import pipeline
+  return pipeline("sentiment-analysis", model=version)
+
+# swap 으로 바꿀 수 있는 모델과 대략적인 메모리 크기 (여기 없는 이름은 받지 않습니다)
+MB = 1024 * 1024
+SENTIMENT_VERSIONS = {
+  "distilbert/distilbert-base-uncased-finetuned-sst-2-english": 270 * MB,
+  "siebert/sentiment-roberta-large-english": 1420 * MB,
+}
+
+# 여러 언어/크기의 모델을 이름으로 관리 (합계가 예산을 넘으면 오래 안 쓰인 모델부터 내림)
+registry = ModelRegistry(budget_bytes=int(os.environ.get("MODEL_BUDGET_MB", "2048")) * MB)
+registry.register("translation-ko-en", translation_pipeline, version="Helsinki-NLP/opus-mt-ko-en",
+                  versions={"Helsinki-NLP/opus-mt-ko-en": 300 * MB})
+registry.register("translation-ja-en", translation_pipeline, version="Helsinki-NLP/opus-mt-ja-en",
+                  versions={"Helsinki-NLP/opus-mt-ja-en": 300 * MB})
+registry.register("sentiment-en-base", sentiment_pipeline, version="distilbert/distilbert-base-uncased-finetuned-sst-2-english",
+                  versions=SENTIMENT_VERSIONS)
+registry.register("sentiment-en-large", sentiment_pipeline, version="siebert/sentiment-roberta-large-english",
+                  versions=SENTIMENT_VERSIONS)
+
+DEFAULT_MODELS = ("translation-ko-en", "sentiment-en-base")
+
+async def load_models():
+  loaded = await registry.preload(*DEFAULT_MODELS)
+  log.info("model_loaded", models=loaded)
+  return loaded
+
+# 서버는 바로 요청을 받고, 기본 모델은 백그라운드에서 불러옵니다 (준비 전 /predict 는 503)
+# 나머지 모델은 처음 요청될 때 불러옵니다
+ml_model = BackgroundLoader(load_models, name="translation+sentiment")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
   # Load the ML model
-  ml_model["translation"] = pipeline("translation", model="Helsinki-NLP/opus-mt-ko-en")
-  ml_model["classifier"] = pipeline("sentiment-analysis")
+  ml_model.start()
   yield
   # Clean up the ML models and release the resources
   ml_model.clear()
+  registry.clear()
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(AccessLogMiddleware, logger=log)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-@app.post("/predict", response_class = HTMLResponse)
-def predict(content: Annotated[str, Form()]):
-  print(content)
-  translated_text = ml_model["translation"](content)
+# /class 페이지는 시작할 때 한 번만 읽고 압축해 둡니다
+pages = PageAssets(Path(__file__).resolve().parent / "templates")
+pages.add("class", "exam12_class.html")
+
+# 같은 문장이 동시에 여러 번 들어오면 번역/분류는 한 번만 실행합니다
+predictions = SingleFlight(max_wait=10)
+
+def run_models(translator, classifier, content: str):
+  translated_text = translator(content)
   eng_content = translated_text[0]['translation_text']
-  print(eng_content)
-  result = ml_model["classifier"](eng_content)
+  result = classifier(eng_content)
   
-  return f"<h3>{result[0]['score']:.3f}% 정확도로 {'긍정' if result[0]['label'] == 'POSITIVE' else '부정'}입니다.</h3>"
-
-@app.get("/class")
-async def main():
-  content = """
-      <!DOCTYPE html> 
-      <html>
-        <head>
-        <meta charset="UTF-8">
-        <title>HTML학습</title>
-      </head>
-      <body>
-        <h1>Hugging Face AI Model 활용</h1>
-        <img src="static/images/hf1.png" width="100">
-        <hr>
-        <h3>긍정&부정을 채크하려는 문장을 한국어로 입력하세요.</h3>
-        <form action="/predict" method="post">
-					<textarea name="content" rows="5" cols="50"></textarea><br>
-					<input type="submit" value="요청">
-        </form>
-      </body>
-    """
-  return HTMLResponse(content=content)  
\ No newline at end of file
+  return eng_content, f"<h3>{result[0]['score']:.3f}% 정확도로 {'긍정' if result[0]['label'] == 'POSITIVE' else '부정'}입니다.</h3>"
+
+@app.post("/predict", response_class = HTMLResponse)
+async def predict(content: Annotated[str, Form()], source: Annotated[Literal["ko", "ja"], Form()] = "ko",
+                  size: Annotated[Literal["base", "large"], Form()] = "base"):
+  ml_model.get()
+  translation, sentiment = f"translation-{source}-en", f"sentiment-en-{size}"
+  # 요청이 끝날 때까지 두 모델 모두 내려가지 않음 (교체되어도 이 요청은 이전 버전으로 끝남)
+  async with registry.use(translation) as translator, registry.use(sentiment) as classifier:
+    # 키에 버전을 넣어 교체 뒤에 들어온 요청이 이전 버전의 결과를 나눠 받지 않도록 함
+    key = ("predict", translation, registry.version(translation), sentiment, registry.version(sentiment), content)
+    eng_content, html = await predictions.run(key, run_models, translator, classifier, content)
+  log.info("predict", content=content, translation=eng_content, models=[translation, sentiment])
+  return html
+
+@app.get("/class", response_class=HTMLResponse)
+async def main(request: Request):
+  return pages.response("class", request)
+
+@app.get("/healthz")
+async def healthz():
+  # 살아 있는지만 확인 (모델 준비 여부와 무관)
+  return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+  # 모델까지 준비되었는지 확인 (준비 전에는 503)
+  return readiness_response(ml_model)
+
+# 관리용: MODEL_ADMIN_TOKEN 환경변수를 설정하고 X-Admin-Token 헤더로 같은 값을 보내야 합니다
+# (설정하지 않으면 관리 기능은 모두 막힙니다)
+ADMIN_TOKEN = os.environ.get("MODEL_ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Annotated[Optional[str], Header()] = None):
+  if not ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+    raise HTTPException(status_code=403, detail="관리자 토큰이 필요합니다")
+
+@app.get("/admin/models", dependencies=[Depends(require_admin)])
+async def list_models():
+  # 올라온 모델, 메모리 사용량, hit 수
+  return registry.stats()
+
+@app.post("/admin/models/{name}/swap", dependencies=[Depends(require_admin)])
+async def swap_model(name: str, version: Annotated[str, Form()]):
+  # 새 버전을 다 불러온 뒤 한 번에 교체 (그동안 요청은 이전 버전이 처리)
+  # 허용되지 않은 버전은 400, 메모리가 모자라거나 불러오기가 실패하면 503
+  result = await registry.swap(name, version)
+  log.info("model_swapped", name=name, version=version)
+  return {"name": name, **result}
+
+@app.delete("/admin/models/{name}", dependencies=[Depends(require_admin)])
+async def unload_model(name: str):
+  # 사용 중이 아니면 바로 메모리에서 내림
+  return {"name": name, "unloaded": registry.unload(name)}
@@ -3,17 +3,38 @@ from fastapi.templating import Jinja2Templates
 from fastapi import Request
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from single_flight import SingleFlight, request_key
+from image_variants import ImageVariants
 
-app = FastAPI()
+# 원본(static/images/*.jpg) 대신 가로 640px WebP 썸네일을 내려줍니다
+# 처음 요청될 때 만들어서 variant_cache/ 와 메모리(최대 32MB)에 보관 (Pillow 가 없으면 원본 그대로)
+variants = ImageVariants("static", cache_dir="variant_cache", presets={"page": 640})
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  yield
+  variants.close()  # 썸네일을 만드는 프로세스 풀 정리
+
+app = FastAPI(lifespan=lifespan)
 templates = Jinja2Templates(directory='templates')
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
+app.include_router(variants.router)  # GET /variants/{preset}/{path}
 
-@app.get('/items/{id}', response_class=HTMLResponse) #html file 로 응답하기
-async def read_item(request: Request, id:int):
-  return templates.TemplateResponse('exam8_v.html', 
+# 같은 페이지 요청이 동시에 몰리면 템플릿 렌더링은 한 번만 합니다
+# (url_for 결과가 접속 주소에 따라 달라지므로 key 에 host 포함)
+renders = SingleFlight(max_wait=5)
+
+def render_item(request: Request, id: int):
+  return templates.get_template('exam8_v.html').render(
                                     {'request':request,
                                      'id':id,
                                      'nextid': 1 if id==10 else id+1,
-                                     'img_name': f'images/{id}.jpg'
+                                     'img_name': variants.url(f'images/{id}.jpg', 'page', request)
                                      })
+
+@app.get('/items/{id}', response_class=HTMLResponse) #html file 로 응답하기
+async def read_item(request: Request, id:int):
+  key = request_key(request, include=("host", "path"))
+  return HTMLResponse(await renders.run(key, render_item, request, id))
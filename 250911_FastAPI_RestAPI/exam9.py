@@ -2,6 +2,8 @@
 
 from fastapi import FastAPI
 from pydantic import BaseModel
+from shared_state import AtomicCell
+from access_log import AccessLogMiddleware, StructuredLogger
 
 class Item(BaseModel):
 	name: str
@@ -10,6 +12,9 @@ class Item(BaseModel):
 	tax: float | None = None
 	
 app = FastAPI()
+
+log = StructuredLogger()
+app.add_middleware(AccessLogMiddleware, logger=log)
 # {
 #   "name":"alice",
 #   "description": "이상한 나라의 앨리스",
@@ -17,15 +22,15 @@ app = FastAPI()
 #   "tax": 0.1
 # }
 
-stored_item = None
+# async 핸들러(이벤트 루프)가 쓰고 def 핸들러(스레드 풀)가 읽으므로 AtomicCell 에 보관
+stored_item = AtomicCell()
 
 @app.post("/items")
 async def create_item(item: Item):
-  global stored_item
-  stored_item = item
-  print(item)
+  stored_item.set(item)
+  log.info("item_created", item=item.model_dump())
   return item.name
 
 @app.get('/items')
 def get_item():
-  return stored_item
\ No newline at end of file
+  return stored_item.get()
\ No newline at end of file
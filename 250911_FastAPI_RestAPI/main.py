@@ -1,17 +1,20 @@
 from fastapi import FastAPI
 # CORS를 위한 미들웨어를 추가합니다.
-from fastapi.middleware.cors import CORSMiddleware
+# (fastapi 기본 CORSMiddleware 대신 preflight 결과를 캐시하는 버전을 사용합니다)
+from fast_cors import CachedCORSMiddleware
 
 app = FastAPI()
 
 # CORS 설정: 모든 출처, 모든 메소드, 모든 헤더를 허용합니다.
 # 실제 서비스에서는 보안을 위해 출처를 명시하는 것이 좋습니다.
+# max_age: 브라우저가 preflight(OPTIONS) 결과를 이 시간(초) 동안 재사용합니다.
 app.add_middleware(
-    CORSMiddleware,
+    CachedCORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=7200,
 )
 
 @app.get("/items/{item_id}")
@@ -0,0 +1,214 @@
+# access_log.py
+# 이벤트 루프를 막지 않는 구조화(JSON) 로그
+#
+# 사용법:
+#   log = StructuredLogger(sample={"/static/": 0.1})
+#   app.add_middleware(AccessLogMiddleware, logger=log)
+#   log.info("item_created", name=item.name)
+#
+#   uvicorn exam9:app --no-access-log    # uvicorn 기본 접속 로그(동기 출력)는 끕니다
+#
+# - 핸들러는 로그 레코드(튜플)를 링 버퍼에 넣기만 하고 바로 돌아갑니다
+# - 백그라운드 스레드가 버퍼에서 batch_size 개씩 꺼내 JSON 으로 바꾼 뒤 한 번에 씁니다
+# - 버퍼가 가득 차면 새 레코드는 버리고 dropped 를 늘립니다 (요청 처리를 기다리게 하지 않음)
+# - sample 에 적은 경로(접두사)는 그 비율만큼만 접속 로그를 남깁니다 (5xx 오류는 항상 기록)
+
+import atexit
+import json
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, TextIO
+
+
+class StructuredLogger:
+    """링 버퍼 + 백그라운드 스레드로 JSON 로그를 쓰는 로거"""
+
+    def __init__(self, stream: Optional[TextIO] = None, buffer_size: int = 65536,
+                 batch_size: int = 512, flush_interval: float = 0.2,
+                 sample: Optional[Dict[str, float]] = None):
+        self.stream = stream or sys.stdout
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # 긴 접두사부터 비교해야 "/static/images/" 가 "/static/" 보다 먼저 맞음
+        self.sample = sorted((sample or {}).items(), key=lambda item: -len(item[0]))
+        self.dropped = 0
+        self.written = 0
+        # deque 의 append / popleft 는 스레드 사이에서 원자적으로 동작하므로 잠금이 필요 없음
+        self._buffer: deque = deque()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name="structured-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -------------------------------------------------------------------------
+    # 기록 (요청 처리 경로 - 최대한 가볍게)
+    # -------------------------------------------------------------------------
+
+    def log(self, level: str, event: str, **fields):
+        if len(self._buffer) >= self.buffer_size:
+            self.dropped += 1
+            return
+        self._buffer.append((time.time(), level, event, fields))
+
+    def info(self, event: str, **fields):
+        self.log("info", event, **fields)
+
+    def warning(self, event: str, **fields):
+        self.log("warning", event, **fields)
+
+    def error(self, event: str, **fields):
+        self.log("error", event, **fields)
+
+    def sampled(self, path: str) -> bool:
+        for prefix, rate in self.sample:
+            if path.startswith(prefix):
+                return rate >= 1 or random.random() < rate
+        return True
+
+    # -------------------------------------------------------------------------
+    # 출력 (백그라운드 스레드)
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _format(record) -> str:
+        timestamp, level, event, fields = record
+        return json.dumps({"ts": round(timestamp, 6), "level": level, "event": event, **fields},
+                          ensure_ascii=False, default=str)
+
+    def _write_batch(self) -> int:
+        buffer = self._buffer
+        lines = []
+        try:
+            for _ in range(self.batch_size):
+                lines.append(self._format(buffer.popleft()))
+        except IndexError:
+            pass
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            self.written += len(lines)
+        return len(lines)
+
+    def _drain(self):
+        while not self._closed:
+            if self._write_batch() < self.batch_size:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+        while self._write_batch():
+            pass
+
+    def flush(self, timeout: float = 5.0):
+        """버퍼가 빌 때까지 기다림 (테스트/종료용)"""
+        deadline = time.monotonic() + timeout
+        self._wakeup.set()
+        while self._buffer and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {"buffered": len(self._buffer), "written": self.written, "dropped": self.dropped}
+
+
+class AccessLogMiddleware:
+    """요청마다 method / path / status / 처리 시간을 구조화 로그로 남기는 ASGI 미들웨어"""
+
+    def __init__(self, app, logger: StructuredLogger):
+        self.app = app
+        self.logger = logger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = scope["path"]
+            if status >= 500 or self.logger.sampled(path):
+                client = scope.get("client")
+                self.logger.log(
+                    "error" if status >= 500 else "info", "access",
+                    method=scope["method"], path=path, status=status,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 3),
+                    client=client[0] if client else None,
+                )
+
+
+# =============================================================================
+# 벤치마크: python access_log.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import asyncio
+    import os
+
+    rps = 20_000
+    devnull = open(os.devnull, "w")
+
+    # 1) 호출 한 번의 비용: print / 동기 JSON 출력 / 링 버퍼
+    #    (/dev/null 은 쓰기가 막히지 않으므로, 실제 터미널·파이프로 출력할 때는 동기 방식의 비용이 더 큼)
+    def sync_print():
+        print('127.0.0.1 - "GET /items HTTP/1.1" 200', file=devnull, flush=True)
+
+    def sync_json():
+        devnull.write(json.dumps({"ts": time.time(), "event": "access", "path": "/items", "status": 200}) + "\n")
+        devnull.flush()
+
+    logger = StructuredLogger(stream=devnull)
+
+    def ring_buffer():
+        logger.info("access", path="/items", status=200, duration_ms=0.1)
+
+    for label, func in (("print()", sync_print), ("동기 json+write", sync_json), ("링 버퍼", ring_buffer)):
+        start = time.perf_counter()
+        for _ in range(rps):
+            func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<16}: {elapsed / rps * 1e6:6.2f} us/요청, {rps:,}건 {elapsed * 1000:7.1f} ms "
+              f"(1초 중 {elapsed * 100:.1f}%)")
+    logger.flush()
+    print("링 버퍼 상태:", logger.stats())
+
+    # 2) 20k RPS 로 1초 동안 미들웨어를 거친 요청 (버퍼가 작으면 dropped 가 생김)
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def noop_send(message):
+        pass
+
+    async def run(app, count):
+        scope = {"type": "http", "method": "GET", "path": "/items", "client": ("127.0.0.1", 1234)}
+        start = time.perf_counter()
+        for _ in range(count):
+            await app(scope, None, noop_send)
+        return time.perf_counter() - start
+
+    base = asyncio.run(run(endpoint, rps))
+    for buffer_size in (65536, 1024):
+        small = StructuredLogger(stream=devnull, buffer_size=buffer_size)
+        with_log = asyncio.run(run(AccessLogMiddleware(endpoint, small), rps))
+        small.flush()
+        print(f"미들웨어 (buffer {buffer_size:>5}): 요청당 추가 {(with_log - base) / rps * 1e6:5.2f} us, {small.stats()}")
+        small.close()
@@ -0,0 +1,210 @@
+# batch_calculator.py
+# 여러 개의 계산을 NumPy 로 한 번에 처리하는 일괄 계산기
+#
+# 요청 형식 (POST /calculator/batch)
+#   1) JSON
+#      {"a": [10, 3, 1], "b": [2, 0, 4], "operation": "divide"}
+#      {"a": [10, 3, 1], "b": [2, 0, 4], "operation": ["add", "divide", "multiply"]}
+#   2) 바이너리 (Content-Type: application/octet-stream)
+#      a 배열(float64, little-endian) n개 + b 배열 n개 [+ 연산 코드(uint8) n개]
+#      연산 코드가 없으면 ?operation=add 처럼 쿼리로 지정합니다
+#
+# 응답은 요청과 같은 형식으로 돌려줍니다.
+# - JSON: 0으로 나눈 자리와 결과가 너무 커서 inf 가 된 자리는 null 이고 errors 에 위치와 이유가 들어갑니다
+# - 바이너리: 결과 float64 n개, 0으로 나눈 자리는 NaN (inf 는 그대로)
+#
+# 두 함수 모두 CPU 를 오래 쓰므로 엔드포인트에서는 run_in_threadpool 로 호출하고,
+# 응답은 이미 직렬화한 Response(바이트)로 돌려줘서 jsonable_encoder 를 거치지 않게 합니다.
+#
+# NumPy(`pip install numpy`)가 없으면 501 오류를 돌려줍니다.
+
+import json
+from typing import List, Optional, Union
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+
+from fast_validation import body_validation_error
+
+try:
+    import numpy as np
+except ImportError:  # numpy 가 없으면 일괄 계산기를 사용할 수 없음
+    np = None
+
+OPERATIONS = ("add", "subtract", "multiply", "divide")
+OPERATION_CODES = {name: code for code, name in enumerate(OPERATIONS)}
+MAX_BATCH_SIZE = 5_000_000
+DIVIDE_BY_ZERO = "0으로 나눌 수 없습니다!"
+NOT_FINITE = "결과가 유한한 수가 아닙니다 (overflow 또는 inf/NaN 입력)"
+
+
+class CalculatorBatch(BaseModel):
+    """JSON 일괄 계산 요청"""
+    a: List[float]
+    b: List[float]
+    operation: Union[str, List[str]] = "add"
+
+
+def _require_numpy():
+    if np is None:
+        raise HTTPException(status_code=501, detail="일괄 계산기는 numpy 가 필요합니다 (pip install numpy)")
+
+
+def _operation_codes(operation: Union[str, List[str]], n: int):
+    """'add' 또는 ['add', 'divide', ...] → 연산 하나(int) 또는 uint8 배열"""
+    if isinstance(operation, str):
+        if operation not in OPERATION_CODES:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 연산입니다: {operation} ({', '.join(OPERATIONS)} 중 선택)")
+        return OPERATION_CODES[operation]
+    if len(operation) != n:
+        raise HTTPException(status_code=400, detail="operation 배열의 길이는 a, b 와 같아야 합니다")
+    try:
+        return np.fromiter((OPERATION_CODES[name] for name in operation), dtype=np.uint8, count=n)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 연산입니다: {e.args[0]}")
+
+
+def _check_size(n_a: int, n_b: int):
+    if n_a != n_b:
+        raise HTTPException(status_code=400, detail="a 와 b 의 길이가 같아야 합니다")
+    if n_a > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BATCH_SIZE:,}개까지 계산할 수 있습니다")
+
+
+def compute(a, b, ops):
+    """벡터 계산 - ops 는 연산 코드 하나 또는 요소별 코드 배열
+
+    0으로 나눈 자리는 NaN 으로 채우고, 그 위치를 bool 배열로 함께 돌려줍니다.
+    결과가 float64 범위를 넘으면 (1e308 * 10 등) inf 가 됩니다.
+    """
+    zero_division = np.zeros(len(a), dtype=bool)
+
+    def apply(code, x, y):
+        if code == 0:
+            return x + y
+        if code == 1:
+            return x - y
+        if code == 2:
+            return x * y
+        out = np.full(len(x), np.nan)
+        np.divide(x, y, out=out, where=(y != 0))
+        return out
+
+    with np.errstate(over="ignore", invalid="ignore"):  # overflow 경고 대신 inf 로 두고 호출한 쪽에서 처리
+        if isinstance(ops, int):
+            result = apply(ops, a, b)
+            if ops == OPERATION_CODES["divide"]:
+                zero_division = b == 0
+            return result, zero_division
+
+        result = np.empty(len(a))
+        for code in np.unique(ops):
+            mask = ops == code
+            result[mask] = apply(int(code), a[mask], b[mask])
+            if code == OPERATION_CODES["divide"]:
+                zero_division |= mask & (b == 0)
+        return result, zero_division
+
+
+def calculate_json(body: bytes) -> Response:
+    _require_numpy()
+    try:
+        batch = CalculatorBatch.model_validate_json(body)
+    except ValidationError as e:
+        # json_body 와 같은 오류 형식 (입력값은 매우 클 수 있으므로 오류에 넣지 않음)
+        raise body_validation_error(e, body, include_input=False)
+    _check_size(len(batch.a), len(batch.b))
+
+    a = np.asarray(batch.a, dtype=np.float64)
+    b = np.asarray(batch.b, dtype=np.float64)
+    result, zero_division = compute(a, b, _operation_codes(batch.operation, len(a)))
+
+    results = result.tolist()
+    errors = []
+    # JSON 에는 NaN / inf 를 쓸 수 없으므로 그런 자리는 null + 오류로 표시
+    for index in np.flatnonzero(~np.isfinite(result)).tolist():
+        results[index] = None
+        errors.append({"index": index, "detail": DIVIDE_BY_ZERO if zero_division[index] else NOT_FINITE})
+    content = json.dumps({"count": len(results), "results": results, "errors": errors},
+                         ensure_ascii=False, allow_nan=False)
+    return Response(content=content.encode(), media_type="application/json")
+
+
+def calculate_binary(body: bytes, operation: Optional[str]) -> Response:
+    _require_numpy()
+    # a, b (float64 8바이트씩) + 선택적 연산 코드(1바이트) → 요소 하나당 16 또는 17 바이트
+    if operation is not None:
+        if len(body) % 16:
+            raise HTTPException(status_code=400, detail="본문 길이가 float64 a/b 배열 형식과 맞지 않습니다")
+        n = len(body) // 16
+    else:
+        if len(body) % 17:
+            raise HTTPException(status_code=400, detail="operation 쿼리가 없으면 본문 끝에 연산 코드(uint8) 배열이 있어야 합니다")
+        n = len(body) // 17
+    _check_size(n, n)
+
+    a = np.frombuffer(body, dtype="<f8", count=n)
+    b = np.frombuffer(body, dtype="<f8", count=n, offset=8 * n)
+    if operation is not None:
+        ops = _operation_codes(operation, n)
+    else:
+        ops = np.frombuffer(body, dtype=np.uint8, count=n, offset=16 * n)
+        if n and ops.max() >= len(OPERATIONS):
+            raise HTTPException(status_code=400, detail="연산 코드는 0(add) 1(subtract) 2(multiply) 3(divide) 중 하나여야 합니다")
+    result, _ = compute(a, b, ops)
+    return Response(content=result.astype("<f8", copy=False).tobytes(), media_type="application/octet-stream")
+
+
+def batch_openapi() -> dict:
+    """/docs 에 JSON / 바이너리 요청 본문을 모두 표시"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": CalculatorBatch.model_json_schema()},
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    }
+
+
+# =============================================================================
+# 벤치마크: python batch_calculator.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import importlib
+    import time
+
+    from fastapi.testclient import TestClient
+
+    examples = importlib.import_module("초보자_실습예제")
+    client = TestClient(examples.app)
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    a = rng.uniform(-100, 100, n)
+    b = rng.integers(0, 10, n).astype(np.float64)
+    ops = rng.integers(0, 4, n).astype(np.uint8)
+
+    # 개별 요청: 2000번 보내고 100만 건으로 환산
+    sample = 2000
+    start = time.perf_counter()
+    for i in range(sample):
+        client.get("/calculator", params={"a": a[i], "b": b[i], "operation": OPERATIONS[ops[i]]})
+    single = (time.perf_counter() - start) / sample
+    print(f"개별 요청      : {single * 1e6:8.1f} us/건 → {n:,}건 약 {single * n:8.1f}s")
+
+    body = json.dumps({"a": a.tolist(), "b": b.tolist(),
+                       "operation": [OPERATIONS[code] for code in ops.tolist()]})
+    start = time.perf_counter()
+    response = client.post("/calculator/batch", content=body, headers={"Content-Type": "application/json"})
+    elapsed = time.perf_counter() - start
+    print(f"JSON 일괄 1번  : {elapsed:8.2f}s (0으로 나눈 자리 {len(response.json()['errors']):,}개)")
+
+    body = a.astype("<f8").tobytes() + b.astype("<f8").tobytes() + ops.tobytes()
+    start = time.perf_counter()
+    response = client.post("/calculator/batch", content=body, headers={"Content-Type": "application/octet-stream"})
+    elapsed = time.perf_counter() - start
+    result = np.frombuffer(response.content, dtype="<f8")
+    print(f"바이너리 일괄 1번: {elapsed:8.2f}s (결과 {len(result):,}개)")
@@ -0,0 +1,160 @@
+# fast_cors.py
+# 헤더를 미리 만들어 두고 preflight 결과를 캐시하는 CORS 미들웨어
+#
+# 사용법 (fastapi.middleware.cors.CORSMiddleware 와 같은 설정):
+#   app.add_middleware(CachedCORSMiddleware, allow_origins=["*"], allow_credentials=True,
+#                      allow_methods=["*"], allow_headers=["*"], max_age=7200)
+#
+# - Access-Control-Max-Age 로 브라우저가 preflight(OPTIONS) 결과를 재사용하게 합니다
+#   (크롬은 최대 7200초, 파이어폭스는 86400초까지 인정)
+# - 응답 헤더 목록은 시작할 때 미리 만들어 두고, 요청마다 리스트를 비교하지 않습니다
+# - 서버 쪽에서도 (origin, method, 요청 헤더) 별 preflight 응답을 캐시합니다
+
+from typing import Dict, Iterable, Sequence, Tuple
+
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+SAFELISTED_HEADERS = {"accept", "accept-language", "content-language", "content-type"}
+
+
+def _header(scope, name: bytes):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+class CachedCORSMiddleware:
+    """CORS 미들웨어 (preflight 캐시 + 미리 계산한 헤더)"""
+
+    def __init__(self, app, allow_origins: Sequence[str] = (), allow_methods: Sequence[str] = ("GET",),
+                 allow_headers: Sequence[str] = (), allow_credentials: bool = False,
+                 expose_headers: Sequence[str] = (), max_age: int = 7200, cache_size: int = 1024):
+        self.app = app
+        self.allow_all_origins = "*" in allow_origins
+        self.allow_origins = frozenset(allow_origins)
+        self.allow_all_headers = "*" in allow_headers
+        self.allow_headers = frozenset(h.lower() for h in allow_headers) | SAFELISTED_HEADERS
+        methods = ALL_METHODS if "*" in allow_methods else tuple(m.upper() for m in allow_methods)
+        self.allow_methods = frozenset(methods)
+        self.allow_credentials = allow_credentials
+        self.cache_size = cache_size
+        # 모든 origin 허용 + 인증정보 없음이면 "*" 를 그대로 보낼 수 있음
+        self.echo_origin = not self.allow_all_origins or allow_credentials
+
+        # 일반 요청에 붙일 헤더 (origin 을 제외한 부분은 고정)
+        simple = []
+        if allow_credentials:
+            simple.append((b"access-control-allow-credentials", b"true"))
+        if expose_headers:
+            simple.append((b"access-control-expose-headers", ", ".join(expose_headers).encode()))
+        self._simple_headers = tuple(simple)
+        self._star_origin = ((b"access-control-allow-origin", b"*"),)
+
+        # preflight 응답의 고정 부분
+        preflight = [
+            (b"access-control-allow-methods", ", ".join(sorted(self.allow_methods)).encode()),
+            (b"access-control-max-age", str(max_age).encode()),
+        ]
+        if allow_credentials:
+            preflight.append((b"access-control-allow-credentials", b"true"))
+        if not self.allow_all_headers and allow_headers:
+            preflight.append((b"access-control-allow-headers", ", ".join(sorted(self.allow_headers)).encode()))
+        self._preflight_headers = tuple(preflight)
+
+        self._preflight_cache: Dict[Tuple[bytes, bytes, bytes], Tuple[int, tuple, bytes]] = {}
+        self.preflights = 0
+        self.preflight_cache_hits = 0
+
+    def _origin_allowed(self, origin: bytes) -> bool:
+        return self.allow_all_origins or origin.decode("latin-1") in self.allow_origins
+
+    def _origin_headers(self, origin: bytes) -> Iterable[Tuple[bytes, bytes]]:
+        if not self.echo_origin:
+            return self._star_origin
+        return ((b"access-control-allow-origin", origin), (b"vary", b"Origin"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = _header(scope, b"origin")
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            request_method = _header(scope, b"access-control-request-method")
+            if request_method is not None:
+                await self._preflight(scope, send, origin, request_method)
+                return
+
+        if not self._origin_allowed(origin):
+            await self.app(scope, receive, send)
+            return
+
+        extra = (*self._origin_headers(origin), *self._simple_headers)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                if self.echo_origin:
+                    # 이미 Vary 가 있으면 Origin 을 덧붙임
+                    for index, (key, value) in enumerate(headers):
+                        if key.lower() == b"vary":
+                            headers[index] = (key, value + b", Origin")
+                            headers.extend(h for h in extra if h[0] != b"vary")
+                            break
+                    else:
+                        headers.extend(extra)
+                else:
+                    headers.extend(extra)
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _preflight(self, scope, send, origin: bytes, request_method: bytes):
+        self.preflights += 1
+        request_headers = _header(scope, b"access-control-request-headers") or b""
+        key = (origin, request_method, request_headers)
+        cached = self._preflight_cache.get(key)
+        if cached is None:
+            cached = self._build_preflight(origin, request_method, request_headers)
+            if len(self._preflight_cache) >= self.cache_size:
+                self._preflight_cache.clear()
+            self._preflight_cache[key] = cached
+        else:
+            self.preflight_cache_hits += 1
+
+        status, headers, body = cached
+        # 바깥 미들웨어가 헤더 리스트를 직접 고쳐도 캐시는 바뀌지 않도록 요청마다 새 리스트로 보냄
+        await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+        await send({"type": "http.response.body", "body": body})
+
+    def _build_preflight(self, origin: bytes, request_method: bytes, request_headers: bytes):
+        failures = []
+        if not self._origin_allowed(origin):
+            failures.append("origin")
+        if request_method.decode("latin-1").upper() not in self.allow_methods:
+            failures.append("method")
+        requested = [h.strip().lower() for h in request_headers.decode("latin-1").split(",") if h.strip()]
+        if not self.allow_all_headers and any(h not in self.allow_headers for h in requested):
+            failures.append("headers")
+
+        headers = [*self._origin_headers(origin), *self._preflight_headers]
+        if self.allow_all_headers and request_headers:
+            headers.append((b"access-control-allow-headers", request_headers))
+        if failures:
+            body = ("Disallowed CORS " + ", ".join(failures)).encode()
+            status = 400
+        else:
+            body = b"OK"
+            status = 200
+        headers.append((b"content-type", b"text/plain; charset=utf-8"))
+        headers.append((b"content-length", str(len(body)).encode()))
+        return status, tuple(headers), body
+
+    def stats(self) -> dict:
+        return {"preflights": self.preflights, "cache_hits": self.preflight_cache_hits,
+                "cached": len(self._preflight_cache)}
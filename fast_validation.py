@@ -0,0 +1,179 @@
+# fast_validation.py
+# Pydantic 검증을 한 번만 하도록 도와주는 함수 모음
+#
+# - json_body(Model)      : 요청 본문(JSON 바이트)을 dict 를 거치지 않고 바로 모델로 검증
+# - body_validation_error : 본문 검증 오류를 FastAPI 기본 형식(loc 가 "body" 로 시작)의 422 로 바꾸기
+# - build_response(Model) : 이미 검증된 값으로 응답 모델을 만들 때 재검증 생략 (model_construct)
+# - model_response(obj)   : 응답 모델을 dict 로 풀었다가 다시 검증하지 않고 바로 JSON 바이트로 응답
+# - to_orm(item, ORM)     : Pydantic 모델을 model_dump() 없이 SQLAlchemy 행 객체로 옮기기
+#
+# 사용법:
+#   @app.post("/students", response_model=StudentResponse,
+#             openapi_extra=json_body_openapi(Student))
+#   async def create_student(student: Student = Depends(json_body(Student))):
+#       ...
+#       response = build_response(StudentResponse, id=1, student=student, message="...")
+#       return model_response(response)
+
+from functools import lru_cache
+from typing import Type, TypeVar
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+
+# =============================================================================
+# 1. JSON 바이트 → 모델 (한 번에 파싱 + 검증)
+# =============================================================================
+
+def json_body(model: Type[M], strict: bool = False):
+    """요청 본문을 model.model_validate_json() 으로 바로 검증하는 의존성
+
+    기본값은 FastAPI 와 같은 변환 규칙("20", 20.0 → 20)이라 기존 클라이언트가 그대로 동작합니다.
+    strict=True 를 직접 지정하면 타입 변환 없이 잘못된 타입을 바로 거절합니다 (새 API 에서만 선택).
+    """
+
+    async def dependency(request: Request) -> M:
+        body = await request.body()
+        try:
+            return model.model_validate_json(body, strict=strict)
+        except ValidationError as e:
+            raise body_validation_error(e, body)
+
+    return dependency
+
+
+def body_validation_error(error: ValidationError, body: bytes, include_input: bool = True) -> RequestValidationError:
+    """FastAPI 기본 오류 형식과 같도록 loc 앞에 "body" 를 붙인 RequestValidationError (큰 본문은 include_input=False)"""
+    return RequestValidationError(
+        [{**e, "loc": ("body", *e["loc"])} for e in error.errors(include_url=False, include_input=include_input)],
+        body=body,
+    )
+
+
+def json_body_openapi(model: Type[BaseModel]) -> dict:
+    """json_body() 를 쓴 엔드포인트도 /docs 에 요청 본문 스키마가 보이도록"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+        }
+    }
+
+
+# =============================================================================
+# 2. 이미 검증된 값으로 모델 만들기
+# =============================================================================
+
+def build_response(model: Type[M], **values) -> M:
+    """모든 값이 이미 검증된 경우에만 사용 (중첩 모델을 다시 검증하지 않음)"""
+    return model.model_construct(**values)
+
+
+def model_response(obj: BaseModel, status_code: int = 200) -> Response:
+    """응답 모델을 바로 JSON 바이트로 직렬화
+
+    response_model 이 있는 엔드포인트에서 모델을 그냥 반환하면 FastAPI 가 dict 로 풀었다가
+    response_model 로 다시 검증합니다. Response 를 반환하면 그 과정을 건너뜁니다.
+    (response_model 은 /docs 표시용으로 그대로 둡니다)
+    """
+    return Response(content=obj.model_dump_json(), media_type="application/json", status_code=status_code)
+
+
+# =============================================================================
+# 3. Pydantic 모델 → ORM 행
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def _shared_fields(model: Type[BaseModel], orm_class) -> tuple:
+    columns = {column.key for column in orm_class.__mapper__.column_attrs}
+    return tuple(name for name in model.model_fields if name in columns)
+
+
+def to_orm(item: BaseModel, orm_class):
+    """item 의 필드 중 ORM 컬럼과 이름이 같은 것만 바로 옮겨 담음"""
+    row = orm_class()
+    for name in _shared_fields(type(item), orm_class):
+        setattr(row, name, getattr(item, name))
+    return row
+
+
+# =============================================================================
+# 벤치마크: python fast_validation.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import importlib
+    import json
+    import time
+
+    examples = importlib.import_module("초보자_실습예제")
+    Student, StudentResponse = examples.Student, examples.StudentResponse
+
+    def make_body(size: int) -> bytes:
+        subjects = []
+        data = {"name": "홍길동", "age": 20, "grade": "대학교", "subjects": subjects, "is_active": True}
+        while len(json.dumps(data, ensure_ascii=False).encode()) < size:
+            subjects.append(f"과목{len(subjects)}")
+        return json.dumps(data, ensure_ascii=False).encode()
+
+    def old_path(body: bytes):
+        # FastAPI 기본 흐름: json.loads → dict 검증 → 응답 모델 생성 → dict 로 풀어서 다시 검증 → JSON
+        student = Student.model_validate(json.loads(body))
+        response = StudentResponse(id=1, student=student, message="ok")
+        checked = StudentResponse.model_validate(response.model_dump())
+        return Response(content=json.dumps(checked.model_dump(mode="json"), ensure_ascii=False))
+
+    def new_path(body: bytes):
+        student = Student.model_validate_json(body)
+        return model_response(build_response(StudentResponse, id=1, student=student, message="ok"))
+
+    for size in (1024, 100 * 1024):
+        body = make_body(size)
+        repeat = 20000 if size < 10000 else 200
+        for label, func in (("이전", old_path), ("이후", new_path)):
+            func(body)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                func(body)
+            elapsed = (time.perf_counter() - start) / repeat * 1e6
+            print(f"{len(body) // 1024:>4} KB {label}: {elapsed:10.1f} us/POST")
+
+    try:
+        from sqlalchemy import Column, Float, Integer, String
+        from sqlalchemy.orm import declarative_base
+    except ImportError:
+        pass
+    else:
+        from typing import Optional
+
+        Base = declarative_base()
+
+        class ItemModel(Base):
+            __tablename__ = "items"
+            id = Column(Integer, primary_key=True)
+            name = Column(String)
+            description = Column(String, nullable=True)
+            price = Column(Float)
+            tax = Column(Float, nullable=True)
+
+        class Item(BaseModel):
+            name: str
+            description: Optional[str] = None
+            price: float
+            tax: Optional[float] = None
+
+        item = Item(name="우유", description="1L", price=2500, tax=0.1)
+        repeat = 20000
+        for label, func in (("ItemModel(**item.model_dump())", lambda: ItemModel(**item.model_dump())),
+                            ("to_orm(item, ItemModel)", lambda: to_orm(item, ItemModel))):
+            func()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                func()
+            elapsed = (time.perf_counter() - start) / repeat * 1e6
+            print(f"{label:<32}: {elapsed:8.2f} us")
@@ -1,12 +1,16 @@
 # C:\githome\18week-REST_FastAPI\fastapi_basic_examples.py
 # FastAPI 기본 실습 예제 모음
 
-from fastapi import FastAPI, Path, Query
+from fastapi import FastAPI, HTTPException, Path, Query
 from pydantic import BaseModel
 from enum import Enum
 from typing import Optional
 import uvicorn
 
+from field_selection import parse_fields, parse_ids, resolve, resolve_batch
+from search_index import sample_index
+from shared_state import IdAllocator
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="FastAPI 기본 실습",
@@ -47,49 +51,79 @@ async def get_count():
 # 2. 패스 매개변수 예제들
 # =============================================================================
 
+# 필드별 값을 만드는 함수 - fields= 로 요청한 필드만 계산합니다
+USER_FIELDS = {
+    "user_id": lambda user_id: user_id,
+    "name": lambda user_id: f"사용자_{user_id}",
+    "status": lambda user_id: "활성",
+}
+
+PRODUCT_FIELDS = {
+    "product_id": lambda product_id: product_id,
+    "name": lambda product_id: f"상품_{product_id}",
+    "price": lambda product_id: 15000,
+    "in_stock": lambda product_id: True,
+}
+
+PROFILE_FIELDS = {
+    "name": lambda profile: profile[0],
+    "age": lambda profile: profile[1],
+    "message": lambda profile: f"{profile[0]}님은 {profile[1]}살입니다.",
+}
+
 @app.get("/user/{user_id}")
-async def get_user(user_id: int):
-    """사용자 ID로 사용자 정보 조회"""
-    return {
-        "user_id": user_id,
-        "name": f"사용자_{user_id}",
-        "status": "활성"
-    }
+async def get_user(user_id: int, fields: Optional[str] = None):
+    """사용자 ID로 사용자 정보 조회 (예: ?fields=name,status)"""
+    return resolve(user_id, parse_fields(fields, USER_FIELDS), USER_FIELDS)
+
+@app.get("/users:batch")
+async def get_users_batch(ids: str, fields: Optional[str] = None):
+    """여러 사용자를 한 번에 조회 (예: /users:batch?ids=1,2,3&fields=name)"""
+    return resolve_batch(parse_ids(ids, int), parse_fields(fields, USER_FIELDS), USER_FIELDS)
 
 @app.get("/product/{product_id}")
-async def get_product(product_id: str):
-    """상품 정보 조회"""
-    return {
-        "product_id": product_id,
-        "name": f"상품_{product_id}",
-        "price": 15000,
-        "in_stock": True
-    }
+async def get_product(product_id: str, fields: Optional[str] = None):
+    """상품 정보 조회 (예: ?fields=name,price)"""
+    return resolve(product_id, parse_fields(fields, PRODUCT_FIELDS), PRODUCT_FIELDS)
+
+@app.get("/product:batch")
+async def get_products_batch(ids: str, fields: Optional[str] = None):
+    """여러 상품을 한 번에 조회 (예: /product:batch?ids=a1,b2&fields=price)"""
+    return resolve_batch(parse_ids(ids), parse_fields(fields, PRODUCT_FIELDS), PRODUCT_FIELDS)
 
 @app.get("/profile/{name}/{age}")
-async def get_profile(name: str, age: int):
-    """이름과 나이로 프로필 조회"""
-    return {
-        "name": name,
-        "age": age,
-        "message": f"{name}님은 {age}살입니다."
-    }
+async def get_profile(name: str, age: int, fields: Optional[str] = None):
+    """이름과 나이로 프로필 조회 (예: ?fields=message)"""
+    return resolve((name, age), parse_fields(fields, PROFILE_FIELDS), PROFILE_FIELDS)
 
 # =============================================================================
 # 3. 쿼리 매개변수 예제들
 # =============================================================================
 
+class Category(str, Enum):
+    electronics = "electronics"
+    clothing = "clothing"
+    books = "books"
+    food = "food"
+    sports = "sports"
+
+# 검색용 상품 인덱스 (샘플 상품으로 시작, /items 생성/수정/삭제 시 바로 반영)
+product_index = sample_index()
+product_ids = IdAllocator(start=1000)
+
 @app.get("/search")
-async def search_items(q: str, limit: int = 10):
-    """검색 기능 - 쿼리 매개변수 사용"""
+async def search_items(q: str, limit: int = Query(10, ge=0)):
+    """검색 기능 - 쿼리 매개변수 사용 (상품 이름 검색)"""
+    found = product_index.search(q=q, limit=limit)
     return {
         "query": q,
         "limit": limit,
-        "results": [f"{q}_결과_{i}" for i in range(1, min(limit + 1, 6))]
+        "total": found["total"],
+        "results": found["items"]
     }
 
 @app.get("/users")
-async def get_users(skip: int = 0, limit: int = 100):
+async def get_users(skip: int = Query(0, ge=0), limit: int = Query(100, ge=0)):
     """사용자 목록 페이지네이션"""
     users = [f"사용자_{i}" for i in range(skip + 1, skip + limit + 1)]
     return {
@@ -102,35 +136,41 @@ async def get_users(skip: int = 0, limit: int = 100):
 @app.get("/items/search")
 async def search_items_advanced(
     q: str,
-    category: Optional[str] = None,
+    category: Optional[Category] = None,
     min_price: Optional[float] = None,
-    max_price: Optional[float] = None
+    max_price: Optional[float] = None,
+    limit: int = Query(10, ge=0),
+    skip: int = Query(0, ge=0)
 ):
-    """고급 검색 기능"""
+    """고급 검색 기능 - 검색어, 카테고리, 가격 범위를 함께 적용"""
     filters = {}
     if category:
         filters["category"] = category
-    if min_price:
-        filters["min_price"] = min_price  
-    if max_price:
+    if min_price is not None:
+        filters["min_price"] = min_price
+    if max_price is not None:
         filters["max_price"] = max_price
     
+    found = product_index.search(
+        q=q,
+        category=category.value if category else None,
+        min_price=min_price,
+        max_price=max_price,
+        limit=limit,
+        skip=skip
+    )
     return {
         "query": q,
         "filters": filters,
-        "results": f"'{q}' 검색 결과"
+        "total": found["total"],
+        "results": found["items"]
     }
 
 # =============================================================================
 # 4. Enum을 활용한 예제
 # =============================================================================
 
-class Category(str, Enum):
-    electronics = "electronics"
-    clothing = "clothing"
-    books = "books"
-    food = "food"
-    sports = "sports"
+# Category 는 위의 고급 검색(/items/search)에서도 사용합니다
 
 @app.get("/category/{category_name}")
 async def get_category_info(category_name: Category):
@@ -201,24 +241,32 @@ async def update_user(user_id: int, user: UserUpdate):
 # =============================================================================
 
 @app.post("/items")
-async def create_item(name: str, price: float):
+async def create_item(name: str, price: float, category: Optional[Category] = None):
     """아이템 생성 (POST)"""
+    item_id = product_ids.next()
+    item = product_index.add(item_id, name, category.value if category else None, price)
     return {
         "message": "아이템이 생성되었습니다",
-        "item": {"name": name, "price": price, "id": 999}
+        "item": item
     }
 
 @app.put("/items/{item_id}")
-async def update_item(item_id: int, name: str, price: float):
+async def update_item(item_id: int, name: str, price: float, category: Optional[Category] = None):
     """아이템 전체 수정 (PUT)"""
+    item = product_index.update(item_id, name, category.value if category else None, price)
+    if item is None:
+        # 없는 id 를 PUT 으로 만들면 POST 가 발급할 id 와 겹칠 수 있으므로 만들지 않음
+        raise HTTPException(status_code=404, detail=f"아이템 {item_id}를 찾을 수 없습니다")
     return {
         "message": f"아이템 {item_id}가 수정되었습니다",
-        "item": {"id": item_id, "name": name, "price": price}
+        "item": item
     }
 
 @app.delete("/items/{item_id}")
 async def delete_item(item_id: int):
     """아이템 삭제 (DELETE)"""
+    if product_index.remove(item_id) is None:
+        raise HTTPException(status_code=404, detail=f"아이템 {item_id}를 찾을 수 없습니다")
     return {
         "message": f"아이템 {item_id}가 삭제되었습니다",
         "deleted_id": item_id
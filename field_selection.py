@@ -0,0 +1,109 @@
+# field_selection.py
+# fields= (필요한 필드만 고르기)와 ids= (여러 개 한 번에 조회) 쿼리 처리 도우미
+#
+# 사용법:
+#   USER_FIELDS = {"name": lambda user_id: f"사용자_{user_id}", ...}
+#
+#   @app.get("/users:batch")
+#   async def get_users_batch(ids: str, fields: Optional[str] = None):
+#       return resolve_batch(parse_ids(ids, int), parse_fields(fields, USER_FIELDS), USER_FIELDS)
+#
+# - 필드마다 값을 만드는 함수(resolver)를 두고, 요청한 필드만 계산합니다
+# - 모르는 필드나 너무 많은 id 는 400 오류로 알려줍니다
+
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+MAX_BATCH_IDS = 1000
+
+Resolvers = Dict[str, Callable[..., Any]]
+
+
+def parse_fields(fields: Optional[str], resolvers: Resolvers) -> List[str]:
+    """'name,price' → ['name', 'price'] (없으면 전체 필드)"""
+    if not fields:
+        return list(resolvers)
+    selected = []
+    for name in fields.split(","):
+        name = name.strip()
+        if not name or name in selected:
+            continue
+        if name not in resolvers:
+            raise HTTPException(
+                status_code=400,
+                detail=f"알 수 없는 필드입니다: {name} (사용 가능: {', '.join(resolvers)})"
+            )
+        selected.append(name)
+    return selected
+
+
+def parse_ids(ids: str, convert: Callable[[str], Any] = str) -> list:
+    """'1,2,3' → [1, 2, 3] (중복 제거, 순서 유지)"""
+    result = []
+    seen = set()
+    for raw in ids.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            value = convert(raw)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"잘못된 id 입니다: {raw}")
+        if value not in seen:
+            seen.add(value)
+            result.append(value)
+    if not result:
+        raise HTTPException(status_code=400, detail="ids 에 하나 이상의 id 를 입력하세요")
+    if len(result) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BATCH_IDS}개까지 조회할 수 있습니다")
+    return result
+
+
+def resolve(key, fields: List[str], resolvers: Resolvers) -> dict:
+    """한 건에 대해 선택한 필드만 계산"""
+    return {name: resolvers[name](key) for name in fields}
+
+
+def resolve_batch(keys: list, fields: List[str], resolvers: Resolvers) -> dict:
+    """여러 건을 한 번에 계산"""
+    getters = [(name, resolvers[name]) for name in fields]
+    return {
+        "count": len(keys),
+        "fields": fields,
+        "items": [{name: get(key) for name, get in getters} for key in keys],
+    }
+
+
+# =============================================================================
+# 벤치마크: python field_selection.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    from fastapi.testclient import TestClient
+
+    from fastapi_basic_examples import app
+
+    client = TestClient(app)
+    n = 500
+    ids = ",".join(str(i) for i in range(1, n + 1))
+
+    start = time.perf_counter()
+    single_bytes = 0
+    for i in range(1, n + 1):
+        single_bytes += len(client.get(f"/user/{i}").content)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_bytes = len(client.get(f"/users:batch?ids={ids}").content)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    name_bytes = len(client.get(f"/users:batch?ids={ids}&fields=name").content)
+    name_only = time.perf_counter() - start
+
+    print(f"단건 {n}번 호출        : {single * 1000:8.1f} ms, {single_bytes:8} bytes")
+    print(f"배치 1번 (전체 필드)   : {batch * 1000:8.1f} ms, {batch_bytes:8} bytes")
+    print(f"배치 1번 (fields=name) : {name_only * 1000:8.1f} ms, {name_bytes:8} bytes")
@@ -0,0 +1,261 @@
+# image_variants.py
+# 원본 이미지 대신 작게 줄인(WebP) 썸네일을 만들어 캐시하고 내려주는 도구
+#
+# 사용법:
+#   variants = ImageVariants("static", cache_dir="variant_cache", presets={"thumb": 320, "large": 960})
+#   app.include_router(variants.router)                     # GET /variants/{preset}/{path}
+#
+#   context["img_name"] = variants.url("images/1.jpg", "thumb", request)
+#   # 템플릿에서는 <img src="{{ img_name }}"> 로 그대로 사용
+#
+# - 처음 요청될 때 프로세스 풀에서 줄이고 인코딩합니다 (CPU 작업이 이벤트 루프/GIL 을 막지 않음)
+# - 결과는 원본 내용 해시로 이름을 붙여 디스크(cache_dir)에 저장하고, 메모리 LRU(바이트 예산)에도 보관합니다
+#   원본이 바뀌면 해시가 바뀌므로 예전 캐시를 지울 필요가 없습니다
+# - URL 에 ?v=해시 가 붙어 있으므로 브라우저는 1년 동안 다시 받지 않습니다 (immutable)
+# - Pillow(`pip install Pillow`)가 없으면 url() 이 원본 정적 파일 주소를 돌려줍니다
+
+import asyncio
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from response_compression import CompressionCache
+from single_flight import SingleFlight
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow 가 없으면 변환 없이 원본을 그대로 사용
+    Image = None
+
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+
+
+def render_variant(source: str, width: int, fmt: str, quality: int) -> bytes:
+    """프로세스 풀에서 실행: 원본을 width 이하로 줄여 fmt 로 인코딩"""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)  # 휴대폰 사진의 회전 정보 반영
+        image.thumbnail((width, width * 4))     # 가로 기준으로 줄이고 비율 유지 (확대는 하지 않음)
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA")
+        buffer = io.BytesIO()
+        image.save(buffer, FORMATS[fmt][0], quality=quality, method=4 if fmt == "webp" else 0)
+        return buffer.getvalue()
+
+
+class ImageVariants:
+    """원본 디렉터리 + 프리셋(이름 → 가로 픽셀) → 변환된 이미지 URL / 응답"""
+
+    def __init__(self, source_dir: str, cache_dir: str = "variant_cache", presets: Optional[Dict[str, int]] = None,
+                 quality: int = 80, memory_budget: int = 32 * 1024 * 1024, workers: Optional[int] = None,
+                 static_name: str = "static", prefix: str = "/variants"):
+        self.source_dir = Path(source_dir).resolve()
+        self.cache_dir = Path(cache_dir)
+        self.presets = presets or {"thumb": 320, "large": 960}
+        self.quality = quality
+        self.static_name = static_name
+        self.prefix = prefix
+        self.enabled = Image is not None
+        # Pillow 빌드에 WebP 지원이 없으면 JPEG 로 대신함
+        self.format = "webp" if self.enabled and features.check("webp") else "jpeg"
+        self.memory = CompressionCache(max_bytes=memory_budget)
+        self._workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}  # 경로 → (mtime_ns, size, 해시)
+        self._renders = SingleFlight(max_wait=None)
+        self.rendered = 0
+        self.disk_hits = 0
+
+        self.router = APIRouter()
+        self.router.add_api_route(prefix + "/{preset}/{path:path}", self.serve, methods=["GET"],
+                                  name="image_variant", include_in_schema=False)
+
+    # -------------------------------------------------------------------------
+    # 원본 / 캐시 파일 이름
+    # -------------------------------------------------------------------------
+
+    def _source(self, path: str) -> Path:
+        source = (self.source_dir / path).resolve()
+        if not source.is_relative_to(self.source_dir) or not source.is_file():
+            raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다")
+        return source
+
+    def content_hash(self, source: Path) -> str:
+        """원본 내용 해시 (파일이 바뀌지 않았으면 stat 만 보고 이전 값을 재사용)"""
+        stat = source.stat()
+        cached = self._hashes.get(str(source))
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        digest = hashlib.blake2b(source.read_bytes(), digest_size=8).hexdigest()
+        self._hashes[str(source)] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def _locate(self, path: str) -> Tuple[Path, str]:
+        """(원본 경로, 내용 해시) - 파일 시스템을 건드리므로 이벤트 루프에서는 스레드로 실행"""
+        source = self._source(path)
+        return source, self.content_hash(source)
+
+    def _cache_name(self, digest: str, preset: str) -> str:
+        return f"{digest}-{self.presets[preset]}w-q{self.quality}.{self.format}"
+
+    # -------------------------------------------------------------------------
+    # 템플릿용 URL
+    # -------------------------------------------------------------------------
+
+    def url(self, path: str, preset: str, request: Request) -> str:
+        """변환 이미지 URL (Pillow 가 없거나 원본이 없으면 원본 정적 파일 URL)"""
+        try:
+            if not self.enabled:
+                raise HTTPException(status_code=404)
+            _, digest = self._locate(path)
+        except HTTPException:
+            return str(request.url_for(self.static_name, path=path))
+        return f"{request.url_for('image_variant', preset=preset, path=path)}?v={digest}"
+
+    # -------------------------------------------------------------------------
+    # 변환 이미지 응답
+    # -------------------------------------------------------------------------
+
+    def _pool_executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        return self._pool
+
+    @staticmethod
+    def _read_cache(cache_file: Path) -> Optional[bytes]:
+        try:
+            return cache_file.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_cache(self, cache_file: Path, data: bytes):
+        # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 이름을 바꿈
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, cache_file)
+
+    async def _render(self, source: Path, preset: str, cache_file: Path) -> bytes:
+        # 디스크 읽기/쓰기는 스레드에서 (이벤트 루프를 막지 않음)
+        data = await asyncio.to_thread(self._read_cache, cache_file)
+        if data is not None:
+            self.disk_hits += 1
+            return data
+        data = await asyncio.get_running_loop().run_in_executor(
+            self._pool_executor(), render_variant, str(source), self.presets[preset], self.format, self.quality)
+        self.rendered += 1
+        await asyncio.to_thread(self._write_cache, cache_file, data)
+        return data
+
+    async def variant(self, path: str, preset: str) -> Tuple[str, bytes]:
+        """(캐시 파일 이름, 바이트) - 메모리 → 디스크 → 새로 생성 순서로 찾음"""
+        if not self.enabled:
+            raise HTTPException(status_code=404, detail="Pillow 가 설치되어 있지 않습니다")
+        if preset not in self.presets:
+            raise HTTPException(status_code=404, detail=f"없는 프리셋입니다: {preset}")
+        # 원본 stat (바뀌었으면 전체 읽기 + 해시) 도 스레드에서
+        source, digest = await asyncio.to_thread(self._locate, path)
+        name = self._cache_name(digest, preset)
+        data = self.memory.get(name)
+        if data is None:
+            # 같은 이미지를 동시에 여러 번 요청해도 한 번만 생성
+            data = await self._renders.run(name, self._render, source, preset, self.cache_dir / name)
+            self.memory.put(name, data)
+        return name, data
+
+    async def serve(self, request: Request, preset: str, path: str, v: Optional[str] = None):
+        name, data = await self.variant(path, preset)
+        etag = f'"{name}"'
+        digest = name.split("-", 1)[0]
+        # ?v= 가 현재 원본 해시와 같으면 내용이 절대 바뀌지 않으므로 오래 캐시
+        cache_control = "public, max-age=31536000, immutable" if v == digest else "public, max-age=60"
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(data, media_type=FORMATS[self.format][1], headers=headers)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {"format": self.format, "rendered": self.rendered, "disk_hits": self.disk_hits,
+                "memory": self.memory.stats()}
+
+
+# =============================================================================
+# 벤치마크: python image_variants.py  (Pillow 필요)
+# 원본 JPEG vs 썸네일 - 내려보내는 바이트, 첫 요청(생성) / 두 번째 요청(캐시) 시간
+# =============================================================================
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+    import time
+
+    from fastapi import FastAPI
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.testclient import TestClient
+
+    if Image is None:
+        raise SystemExit("Pillow 가 필요합니다 (pip install Pillow)")
+
+    workdir = Path(tempfile.mkdtemp())
+    images = workdir / "static" / "images"
+    images.mkdir(parents=True)
+    random.seed(0)
+    for i in range(1, 11):
+        # 사진처럼 잘 압축되지 않는 2400x1600 이미지 (노이즈 + 그라데이션)
+        noise = Image.effect_noise((2400, 1600), 40).convert("RGB")
+        gradient = Image.linear_gradient("L").resize((2400, 1600)).convert("RGB")
+        Image.blend(noise, gradient, random.random()).save(images / f"{i}.jpg", quality=90)
+
+    def build_app():
+        app = FastAPI()
+        app.mount("/static", StaticFiles(directory=workdir / "static"), name="static")
+        variants = ImageVariants(workdir / "static", cache_dir=workdir / "variant_cache",
+                                 presets={"thumb": 320, "large": 960})
+        app.include_router(variants.router)
+        return app, variants
+
+    def timed_get(client, url):
+        start = time.perf_counter()
+        response = client.get(url)
+        response.raise_for_status()
+        return time.perf_counter() - start, len(response.content)
+
+    try:
+        app, variants = build_app()
+        with TestClient(app) as client:
+            originals = [timed_get(client, f"/static/images/{i}.jpg") for i in range(1, 11)]
+            total_original = sum(size for _, size in originals)
+            print(f"원본 JPEG 10장: {total_original / 1024:8.0f} KB, 평균 {sum(t for t, _ in originals) / 10 * 1000:6.2f} ms")
+
+            for preset in ("thumb", "large"):
+                first = [timed_get(client, f"/variants/{preset}/images/{i}.jpg") for i in range(1, 11)]
+                second = [timed_get(client, f"/variants/{preset}/images/{i}.jpg") for i in range(1, 11)]
+                size = sum(s for _, s in first)
+                print(f"{preset:<6} {variants.format} 10장: {size / 1024:8.0f} KB ({size / total_original:5.1%}), "
+                      f"첫 요청 평균 {sum(t for t, _ in first) / 10 * 1000:6.2f} ms, "
+                      f"두 번째 {sum(t for t, _ in second) / 10 * 1000:6.2f} ms")
+            print("상태:", variants.stats())
+        variants.close()
+
+        # 서버 재시작 (메모리 캐시는 비었지만 디스크 캐시는 남아 있음)
+        app, variants = build_app()
+        with TestClient(app) as client:
+            restarted = [timed_get(client, f"/variants/thumb/images/{i}.jpg") for i in range(1, 11)]
+            print(f"재시작 후 thumb (디스크 캐시): 평균 {sum(t for t, _ in restarted) / 10 * 1000:6.2f} ms, "
+                  f"{variants.stats()}")
+        variants.close()
+    finally:
+        shutil.rmtree(workdir)
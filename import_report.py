@@ -0,0 +1,111 @@
+# import_report.py
+# 앱 모듈의 import 시간과 서버 시작 후 첫 응답까지 걸리는 시간(TTFB) 측정 도구
+#
+# 사용법:
+#   python import_report.py 250911_FastAPI_RestAPI/exam11.py              # import 시간 상위 20개
+#   python import_report.py 250911_FastAPI_RestAPI/exam11.py --top 40
+#   python import_report.py 250911_FastAPI_RestAPI/exam11.py --ttfb /healthz --ttfb /readyz
+#
+# - import 시간은 `python -X importtime -c "import 모듈"` 의 출력을 모아서 보여줍니다
+#   (cumulative: 하위 import 포함 시간, self: 그 모듈만의 시간)
+# - TTFB 는 uvicorn 을 새 프로세스로 띄운 순간부터 해당 경로의 첫 응답을 받을 때까지의 시간입니다
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+def import_times(module: str, cwd: Path) -> list:
+    """[(cumulative_us, self_us, 모듈 이름), ...] - 오래 걸린 순"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} 실패:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    rows.sort(reverse=True)
+    return rows
+
+
+def print_import_report(module: str, cwd: Path, top: int):
+    rows = import_times(module, cwd)
+    total = max((cumulative for cumulative, _, name in rows if name.strip() == module), default=0)
+    print(f"import {module}: {total / 1000:.1f} ms (모듈 {len(rows)}개)\n")
+    print(f"{'cumulative':>12}{'self':>10}  module")
+    for cumulative, self_us, name in rows[:top]:
+        print(f"{cumulative / 1000:>10.1f}ms{self_us / 1000:>8.1f}ms  {name}")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_byte(module: str, cwd: Path, paths: list, timeout: float = 300) -> dict:
+    """uvicorn 시작 → 각 경로가 처음으로 응답(상태 코드 무관)/200 을 준 시각"""
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--port", str(port), "--no-access-log",
+         "--log-level", "warning"],
+        cwd=cwd, env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    first_byte, first_ok = {}, {}
+    try:
+        while len(first_ok) < len(paths) and time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise SystemExit("uvicorn 이 종료되었습니다")
+            for path in paths:
+                if path in first_ok:
+                    continue
+                try:
+                    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                    connection.request("GET", path)
+                    status = connection.getresponse().status
+                    connection.close()
+                except OSError:
+                    continue
+                now = time.perf_counter() - start
+                first_byte.setdefault(path, now)
+                if status == 200:
+                    first_ok[path] = now
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return {path: (first_byte.get(path), first_ok.get(path)) for path in paths}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import 시간 / TTFB 측정")
+    parser.add_argument("app_file", help="앱 파일 경로 (예: 250911_FastAPI_RestAPI/exam11.py)")
+    parser.add_argument("--top", type=int, default=20, help="보여줄 모듈 수")
+    parser.add_argument("--ttfb", action="append", metavar="PATH", help="첫 응답 시간을 잴 경로 (여러 번 지정 가능)")
+    args = parser.parse_args()
+
+    app_file = Path(args.app_file).resolve()
+    module, cwd = app_file.stem, app_file.parent
+    print_import_report(module, cwd, args.top)
+
+    if args.ttfb:
+        print(f"\nuvicorn {module}:app 시작 후")
+        for path, (first, ok) in time_to_first_byte(module, cwd, args.ttfb).items():
+            first_text = f"{first:.2f}s" if first is not None else "응답 없음"
+            ok_text = f"{ok:.2f}s" if ok is not None else "200 없음"
+            print(f"  {path:<12} 첫 응답 {first_text:>8}, 첫 200 {ok_text:>8}")
+
+
+if __name__ == "__main__":
+    main()
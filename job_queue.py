@@ -0,0 +1,325 @@
+# job_queue.py
+# 요청이 끝난 뒤에 처리해도 되는 느린 작업을 맡기는 프로세스 내부 작업 큐
+#
+# 사용법:
+#   jobs = JobQueue(concurrency=2, db_path="jobs.db")   # db_path 가 없으면 메모리에만 보관
+#
+#   @jobs.task("save_item")
+#   def save_item(data: dict, job_id: str):
+#       ...                                              # def / async def 모두 가능
+#
+#   @asynccontextmanager
+#   async def lifespan(app):
+#       await jobs.start()
+#       yield
+#       await jobs.stop()
+#
+#   @app.post("/items", status_code=202)
+#   async def create_item(item: Item):
+#       job_id = await jobs.enqueue("save_item", item.model_dump())
+#       return {"job_id": job_id}
+#
+# - asyncio 작업자 concurrency 개가 큐에서 작업을 꺼내 실행합니다 (동시 실행 수 제한)
+# - 실패하면 base_delay * 2^(시도-1) 초 뒤에 다시 시도하고, max_attempts 번 실패하면 failed
+# - db_path 를 주면 SQLite 에 작업을 기록해서, 서버가 재시작되어도 끝나지 않은 작업을 이어서 실행합니다
+#   (그래서 작업 인자는 JSON 으로 바꿀 수 있는 값이어야 합니다)
+# - 재시작하면 실행 중이던 작업도 다시 실행되므로, 작업 함수는 여러 번 실행되어도 결과가 같아야 합니다
+#   작업 함수가 job_id 인자를 받으면 작업 id 를 넘겨 주므로 이를 키로 중복 저장을 막을 수 있습니다
+# - 작업 하나의 오류(SQLite 기록 실패 포함)는 로그로 남기고 작업자는 계속 다음 작업을 처리합니다
+
+import asyncio
+import inspect
+import json
+import logging
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+QUEUED, RUNNING, RETRYING, DONE, FAILED = "queued", "running", "retrying", "done", "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class _JobStore:
+    """SQLite 작업 기록 (db_path 가 있을 때만 사용)"""
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # WAL + NORMAL: 작업 기록은 자주 쓰므로 커밋마다 fsync 하지 않음 (전원 차단 시 마지막 몇 건만 유실 가능)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._db:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    run_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )""")
+
+    def save(self, job: dict):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job["id"], job["name"], json.dumps(job["payload"], ensure_ascii=False), job["status"],
+                 job["attempts"], job["error"], job["run_at"], job["created_at"], job["updated_at"]))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def unfinished(self) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM jobs WHERE status NOT IN (?, ?) ORDER BY created_at", (DONE, FAILED)).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    @staticmethod
+    def _to_job(row) -> dict:
+        keys = ("id", "name", "payload", "status", "attempts", "error", "run_at", "created_at", "updated_at")
+        job = dict(zip(keys, row))
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JobQueue:
+    """재시도와 (선택적) SQLite 영속성을 가진 비동기 작업 큐"""
+
+    def __init__(self, concurrency: int = 2, db_path: Optional[str] = None,
+                 max_attempts: int = 3, base_delay: float = 0.5, keep_finished: int = 1000):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.keep_finished = keep_finished  # 메모리에 남겨 둘 끝난 작업 수
+        self._store = _JobStore(db_path) if db_path else None
+        self._tasks: Dict[str, Callable[..., Any]] = {}
+        self._wants_job_id = set()  # job_id 인자를 받는 작업 이름
+        self._jobs: Dict[str, dict] = {}
+        self._finished = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._timers = set()
+
+    def task(self, name: str):
+        """작업 함수 등록 데코레이터"""
+        def decorator(func):
+            self._tasks[name] = func
+            if "job_id" in inspect.signature(func).parameters:
+                self._wants_job_id.add(name)
+            return func
+        return decorator
+
+    # -------------------------------------------------------------------------
+    # 시작 / 종료
+    # -------------------------------------------------------------------------
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        if self._store is not None:
+            # 지난번에 끝나지 않은 작업(실행 중에 꺼진 것 포함)을 다시 예약
+            for job in await run_in_threadpool(self._store.unfinished):
+                job["status"] = QUEUED if job["status"] == RUNNING else job["status"]
+                self._jobs[job["id"]] = job
+                self._schedule(job)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain: bool = True):
+        """drain=True 이면 큐에 남은 작업을 끝낸 뒤 종료 (예약된 재시도는 다음 시작 때 실행)"""
+        if drain and self._queue is not None:
+            await self._queue.join()
+        for timer in list(self._timers):
+            timer.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, *self._timers, return_exceptions=True)
+        self._workers = []
+        if self._store is not None:
+            self._store.close()
+
+    # -------------------------------------------------------------------------
+    # 작업 추가 / 상태 조회
+    # -------------------------------------------------------------------------
+
+    async def enqueue(self, name: str, payload: Any = None) -> str:
+        if name not in self._tasks:
+            raise KeyError(f"등록되지 않은 작업입니다: {name}")
+        now = time.time()
+        job = {"id": uuid.uuid4().hex, "name": name, "payload": payload, "status": QUEUED,
+               "attempts": 0, "error": None, "run_at": now, "created_at": now, "updated_at": now}
+        if self._store is not None:
+            await run_in_threadpool(self._store.save, job)  # 기록에 실패하면 작업을 받지 않음 (호출한 쪽에 오류)
+        self._jobs[job["id"]] = job
+        self._queue.put_nowait(job["id"])
+        return job["id"]
+
+    async def status(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            job = await run_in_threadpool(self._store.get, job_id)
+        if job is None:
+            return None
+        return {key: job[key] for key in ("id", "name", "status", "attempts", "error", "created_at", "updated_at")}
+
+    def stats(self) -> dict:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"queued": self._queue.qsize() if self._queue else 0, "jobs": counts}
+
+    # -------------------------------------------------------------------------
+    # 내부 동작
+    # -------------------------------------------------------------------------
+
+    def _schedule(self, job: dict):
+        delay = job["run_at"] - time.time()
+        if delay <= 0:
+            self._queue.put_nowait(job["id"])
+            return
+
+        async def later():
+            await asyncio.sleep(delay)
+            self._queue.put_nowait(job["id"])
+
+        timer = asyncio.create_task(later())
+        self._timers.add(timer)
+        timer.add_done_callback(self._timers.discard)
+
+    async def _save(self, job: dict):
+        job["updated_at"] = time.time()
+        if self._store is not None:
+            await run_in_threadpool(self._store.save, job)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(self._jobs[job_id])
+            except Exception:
+                # 작업 하나 때문에 작업자가 멈추면 이후 작업이 모두 queued 로 남으므로 기록만 하고 계속
+                logger.exception("작업 %s 처리 중 오류", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: dict):
+        func = self._tasks.get(job["name"])
+        job["status"] = RUNNING
+        job["attempts"] += 1
+        try:
+            # 기록 실패(database is locked 등)도 한 번의 실패한 시도로 보고 재시도
+            await self._save(job)
+            if func is None:
+                raise KeyError(f"등록되지 않은 작업입니다: {job['name']}")
+            kwargs = {"job_id": job["id"]} if job["name"] in self._wants_job_id else {}
+            if inspect.iscoroutinefunction(func):
+                await func(job["payload"], **kwargs)
+            else:
+                await run_in_threadpool(func, job["payload"], **kwargs)
+        except Exception:
+            job["error"] = traceback.format_exc(limit=3)
+            if job["attempts"] >= self.max_attempts:
+                job["status"] = FAILED
+                self._forget(job)
+            else:
+                job["status"] = RETRYING
+                job["run_at"] = time.time() + self.base_delay * 2 ** (job["attempts"] - 1)
+                self._schedule(job)
+        else:
+            job["status"] = DONE
+            job["error"] = None
+            self._forget(job)
+        # 여기서 기록이 실패해도 메모리 상태와 재시도 예약은 이미 끝났음
+        # (SQLite 에 running 으로 남으면 재시작 때 다시 실행되므로 작업은 멱등이어야 함)
+        await self._save(job)
+
+    def _forget(self, job: dict):
+        # 끝난 작업은 최근 keep_finished 개만 메모리에 남김 (나머지는 SQLite 에서 조회)
+        self._finished.append(job["id"])
+        while len(self._finished) > self.keep_finished:
+            self._jobs.pop(self._finished.pop(0), None)
+
+
+# =============================================================================
+# 벤치마크: python job_queue.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from contextlib import asynccontextmanager
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    workdir = tempfile.mkdtemp()
+    data_db = sqlite3.connect(os.path.join(workdir, "fridge.db"), check_same_thread=False)
+    data_db.execute("CREATE TABLE items (name TEXT, price REAL)")
+    data_lock = threading.Lock()
+
+    def save_item(data: dict):
+        # 요청 경로에서 하던 INSERT + COMMIT (디스크 동기화 포함)
+        with data_lock, data_db:
+            data_db.execute("INSERT INTO items VALUES (?, ?)", (data["name"], data["price"]))
+
+    jobs = JobQueue(concurrency=1, db_path=os.path.join(workdir, "jobs.db"))
+    memory_jobs = JobQueue(concurrency=1)
+    jobs.task("save_item")(save_item)
+    memory_jobs.task("save_item")(save_item)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await jobs.start()
+        await memory_jobs.start()
+        yield
+        await memory_jobs.stop()
+        await jobs.stop()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.post("/inline", status_code=201)
+    def create_inline(name: str, price: float):
+        save_item({"name": name, "price": price})
+        return {"name": name}
+
+    @app.post("/queued", status_code=202)
+    async def create_queued(name: str, price: float):
+        return {"job_id": await jobs.enqueue("save_item", {"name": name, "price": price})}
+
+    @app.post("/queued-memory", status_code=202)
+    async def create_queued_memory(name: str, price: float):
+        return {"job_id": await memory_jobs.enqueue("save_item", {"name": name, "price": price})}
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        return await jobs.status(job_id)
+
+    repeat = 300
+    with TestClient(app) as client:
+        for path in ("/inline", "/queued-memory", "/queued"):
+            timings = []
+            for i in range(repeat):
+                start = time.perf_counter()
+                response = client.post(path, params={"name": f"우유{i}", "price": 2500})
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            print(f"{path:<15} 중앙값 {timings[repeat // 2] * 1000:6.2f} ms, "
+                  f"p99 {timings[int(repeat * 0.99)] * 1000:6.2f} ms (status {response.status_code})")
+            if path == "/queued":
+                job_id = response.json()["job_id"]
+    print("종료 후 마지막 작업 상태:", _JobStore(os.path.join(workdir, "jobs.db")).get(job_id)["status"])
@@ -0,0 +1,389 @@
+# model_registry.py
+# 여러 모델을 이름으로 관리하는 레지스트리 (메모리 예산 + LRU 언로드 + 무중단 교체)
+#
+# 사용법:
+#   registry = ModelRegistry(budget_bytes=2 * 1024**3)
+#   registry.register("sentiment-en-base", sentiment_pipeline, version="distilbert/...")
+#
+#   @app.post("/predict")
+#   async def predict(content: Annotated[str, Form()]):
+#       async with registry.use("sentiment-en-base") as model:   # 없으면 이때 불러옴
+#           return await run_in_threadpool(model, content)
+#
+#   await registry.swap("sentiment-en-base", "siebert/...")     # 새 버전으로 교체 (versions 에 등록된 것만)
+#
+# - 모델은 처음 쓰일 때 스레드에서 불러오고, 동시에 같은 모델을 요청하면 한 번만 불러옵니다
+# - 불러온 모델 크기의 합이 budget_bytes 를 넘으면 가장 오래 안 쓰인 모델부터 내립니다
+#   (use() 로 사용 중인 모델은 내리지 않고, 요청이 끝난 뒤 다시 확인합니다)
+# - swap() 은 새 버전을 다 불러온 다음 한 번에 바꿔 끼웁니다. 그동안 요청은 이전 버전이 처리하고,
+#   이전 버전은 그 요청들이 모두 끝나야 메모리에서 내립니다
+# - swap() 은 register(versions=...) 에 적어 둔 버전만 받고, 예상 크기가 예산에 들어가지 않으면
+#   불러오기 전에 거절합니다. 불러오기가 실패하면 503 으로 돌려줍니다 (이전 버전은 계속 사용)
+# - 모든 상태 변경은 이벤트 루프 안에서만 일어나므로 잠금이 필요 없습니다
+
+import sys
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from single_flight import SingleFlight
+
+
+def model_nbytes(model: Any) -> int:
+    """모델이 차지하는 메모리 추정 (torch 파라미터/버퍼, numpy 배열, 그 밖은 getsizeof)"""
+    inner = getattr(model, "model", model)  # transformers pipeline 은 .model 에 실제 모델이 있음
+    parameters = getattr(inner, "parameters", None)
+    if callable(parameters):
+        total = sum(p.numel() * p.element_size() for p in parameters())
+        buffers = getattr(inner, "buffers", None)
+        if callable(buffers):
+            total += sum(b.numel() * b.element_size() for b in buffers())
+        return total
+    nbytes = getattr(model, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(model)
+
+
+class _Spec:
+    """등록된 모델 정보 + 누적 통계 (언로드되어도 유지)"""
+
+    def __init__(self, name: str, factory: Callable[[str], Any], version: str, nbytes: Optional[int],
+                 versions: Dict[str, Optional[int]]):
+        self.name = name
+        self.factory = factory
+        self.version = version
+        self.nbytes = nbytes
+        self.versions = versions  # swap() 으로 바꿀 수 있는 버전 → 예상 크기(바이트, 모르면 None)
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.swaps = 0
+        self.load_seconds: Optional[float] = None
+
+
+class _Entry:
+    """메모리에 올라온 모델 하나"""
+
+    def __init__(self, name: str, version: str, model: Any, nbytes: int):
+        self.name = name
+        self.version = version
+        self.model = model
+        self.nbytes = nbytes
+        self.refs = 0
+        self.retired = False
+        self.loaded_at = time.time()
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """이름 → 모델, 메모리 예산 안에서 LRU 로 관리"""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._specs: Dict[str, _Spec] = {}
+        self._loaded: "OrderedDict[str, _Entry]" = OrderedDict()  # 앞쪽이 가장 오래 안 쓰인 모델
+        self._retired: list = []  # 교체되었지만 아직 사용 중인 이전 버전
+        self._loads = SingleFlight(max_wait=None)
+
+    # -------------------------------------------------------------------------
+    # 등록
+    # -------------------------------------------------------------------------
+
+    def register(self, name: str, factory: Callable[[str], Any], version: str, nbytes: Optional[int] = None,
+                 versions: Optional[Dict[str, Optional[int]]] = None):
+        """factory(version) 이 모델을 만들어 돌려줌
+
+        nbytes 를 주면 크기 추정 대신 사용하고, versions 에는 swap() 으로 바꿀 수 있는 버전과
+        예상 크기를 적습니다 (처음 version 은 항상 포함).
+        """
+        allowed = dict(versions or {})
+        allowed.setdefault(version, nbytes)
+        self._specs[name] = _Spec(name, factory, version, nbytes, allowed)
+
+    def _spec(self, name: str) -> _Spec:
+        spec = self._specs.get(name)
+        if spec is None:
+            raise HTTPException(status_code=404, detail=f"등록되지 않은 모델입니다: {name}")
+        return spec
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(e.nbytes for e in self._loaded.values()) + sum(e.nbytes for e in self._retired)
+
+    # -------------------------------------------------------------------------
+    # 사용
+    # -------------------------------------------------------------------------
+
+    def version(self, name: str) -> str:
+        """지금 새 요청에 내주는 버전 (swap 이 끝나면 바로 새 버전)"""
+        return self._spec(name).version
+
+    @asynccontextmanager
+    async def use(self, name: str):
+        """async with 블록이 끝날 때까지 모델을 내리지 않음"""
+        entry = await self._acquire(name)
+        try:
+            yield entry.model
+        finally:
+            self._release(entry)
+
+    async def _acquire(self, name: str) -> _Entry:
+        spec = self._spec(name)
+        while True:
+            entry = self._loaded.get(name)
+            if entry is not None:
+                # 확인과 refs 증가 사이에 await 가 없으므로 그 사이에 내려가지 않음
+                entry.refs += 1
+                entry.last_used = time.monotonic()
+                self._loaded.move_to_end(name)
+                spec.hits += 1
+                return entry
+            # 불러오는 동안 같은 모델을 요청한 다른 요청은 이 결과를 기다림
+            await self._loads.run(("load", name, spec.version), self._load, spec, spec.version)
+
+    def _release(self, entry: _Entry):
+        entry.refs -= 1
+        entry.last_used = time.monotonic()
+        if entry.retired:
+            if entry.refs == 0:
+                self._retired.remove(entry)
+                self._unload(entry)
+        else:
+            self._evict()
+
+    async def _build(self, spec: _Spec, version: str):
+        try:
+            return await run_in_threadpool(spec.factory, version)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"{spec.name} ({version}) 모델을 불러오지 못했습니다: "
+                                                        f"{type(e).__name__}: {e}")
+
+    async def _load(self, spec: _Spec, version: str):
+        start = time.perf_counter()
+        estimate = spec.versions.get(version) or spec.nbytes
+        if estimate:
+            self._evict(extra=estimate)  # 크기를 알면 불러오기 전에 미리 자리를 비움
+        model = await self._build(spec, version)
+        if spec.version != version or spec.name in self._loaded:
+            return  # 불러오는 사이에 swap() 으로 다른 버전이 자리를 차지함
+        entry = _Entry(spec.name, version, model, spec.nbytes or model_nbytes(model))
+        spec.loads += 1
+        spec.load_seconds = time.perf_counter() - start
+        self._loaded[spec.name] = entry
+        self._evict(keep=entry)
+
+    async def preload(self, *names: str) -> list:
+        """서버 시작 시 미리 불러오기 (readiness.BackgroundLoader 에 넘겨서 사용)"""
+        for name in names:
+            self._release(await self._acquire(name))
+            self._specs[name].hits -= 1  # 미리 불러온 것은 hit 로 세지 않음
+        return list(names)
+
+    # -------------------------------------------------------------------------
+    # 언로드 / 교체
+    # -------------------------------------------------------------------------
+
+    def _evict(self, keep: Optional[_Entry] = None, extra: int = 0):
+        """예산을 넘으면 (extra 바이트를 더 올릴 자리까지) 사용 중이 아닌 모델을 오래된 순으로 내림"""
+        limit = self.budget_bytes - extra
+        if self.used_bytes <= limit:
+            return
+        for name, entry in list(self._loaded.items()):
+            if self.used_bytes <= limit:
+                break
+            if entry.refs or entry is keep:
+                continue
+            del self._loaded[name]
+            self._specs[name].evictions += 1
+            self._unload(entry)
+
+    @staticmethod
+    def _unload(entry: _Entry):
+        # 참조만 끊으면 파이썬이 메모리를 돌려받음 (GPU 라면 여기서 torch.cuda.empty_cache())
+        entry.model = None
+
+    async def swap(self, name: str, version: str) -> dict:
+        """새 버전을 불러온 뒤 한 번에 교체 (교체 전까지는 이전 버전이 계속 응답)"""
+        spec = self._spec(name)
+        if version not in spec.versions:
+            raise HTTPException(status_code=400, detail=f"{name} 에 허용되지 않은 버전입니다: {version} "
+                                                        f"(가능: {', '.join(spec.versions)})")
+        estimate = spec.versions[version] or spec.nbytes
+        if estimate:
+            # 교체 중에는 이전 버전과 새 버전이 함께 올라가므로 둘 다 들어갈 자리가 있어야 함
+            self._evict(keep=self._loaded.get(name), extra=estimate)
+            if self.used_bytes + estimate > self.budget_bytes:
+                raise HTTPException(status_code=503, headers={"Retry-After": "5"},
+                                    detail=f"메모리 예산이 부족해 {name} ({version}) 을 불러올 수 없습니다 "
+                                           f"(사용 중 {self.used_bytes} + 예상 {estimate} > 예산 {self.budget_bytes})")
+        start = time.perf_counter()
+        model = await self._build(spec, version)
+        new = _Entry(name, version, model, spec.nbytes or model_nbytes(model))
+
+        # 여기부터 await 없이 한 번에 바꿈 → 요청은 이전 버전 아니면 새 버전만 보게 됨
+        old = self._loaded.get(name)
+        spec.version = version
+        spec.swaps += 1
+        spec.load_seconds = time.perf_counter() - start
+        self._loaded[name] = new
+        self._loaded.move_to_end(name)
+        if old is not None:
+            old.retired = True
+            if old.refs:
+                self._retired.append(old)  # 사용 중인 요청이 끝나면 _release 에서 내림
+            else:
+                self._unload(old)
+        self._evict(keep=new)
+        return self._describe(new)
+
+    def unload(self, name: str) -> bool:
+        """관리용: 사용 중이 아니면 바로 내림"""
+        self._spec(name)
+        entry = self._loaded.get(name)
+        if entry is None or entry.refs:
+            return False
+        del self._loaded[name]
+        self._unload(entry)
+        return True
+
+    def clear(self):
+        """서버 종료 시 모두 내림"""
+        for entry in [*self._loaded.values(), *self._retired]:
+            self._unload(entry)
+        self._loaded.clear()
+        self._retired.clear()
+
+    # -------------------------------------------------------------------------
+    # 상태
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _describe(entry: _Entry) -> dict:
+        return {"version": entry.version, "bytes": entry.nbytes, "in_use": entry.refs,
+                "idle_seconds": round(time.monotonic() - entry.last_used, 3)}
+
+    def stats(self) -> dict:
+        models = []
+        for name, spec in self._specs.items():
+            entry = self._loaded.get(name)
+            models.append({
+                "name": name,
+                "version": spec.version,
+                "versions": list(spec.versions),
+                "loaded": entry is not None,
+                **(self._describe(entry) if entry is not None else {}),
+                "hits": spec.hits,
+                "loads": spec.loads,
+                "evictions": spec.evictions,
+                "swaps": spec.swaps,
+                "load_seconds": spec.load_seconds,
+            })
+        return {
+            "budget_bytes": self.budget_bytes,
+            "used_bytes": self.used_bytes,
+            "loaded": list(self._loaded),  # 오래 안 쓰인 순
+            "retired": [{"name": e.name, "version": e.version, "in_use": e.refs} for e in self._retired],
+            "models": models,
+        }
+
+
+# =============================================================================
+# 시뮬레이션: python model_registry.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import asyncio
+    import random
+
+    MB = 1024 * 1024
+    SIZES = {"sentiment-en-base": 270, "sentiment-en-large": 1400, "sentiment-multi": 680,
+             "translation-ko-en": 310, "translation-ja-en": 300}
+
+    class FakeModel:
+        """크기만 흉내 내는 모델 (불러오는 데 크기에 비례한 시간이 걸림)"""
+
+        def __init__(self, name: str, version: str):
+            time.sleep(SIZES[name] / 10_000)
+            self.name, self.version = name, version
+            self.nbytes = SIZES[name] * MB
+
+        def __call__(self, text: str) -> str:
+            time.sleep(0.002)
+            return self.version
+
+    def build_registry(budget_mb: int) -> ModelRegistry:
+        registry = ModelRegistry(budget_bytes=budget_mb * MB)
+        for name in SIZES:
+            registry.register(name, lambda version, name=name: FakeModel(name, version), version="v1",
+                              versions={"v1": SIZES[name] * MB, "v2": SIZES[name] * MB})
+        return registry
+
+    async def traffic(registry: ModelRegistry, requests: int, concurrency: int) -> list:
+        # 몇몇 모델에 요청이 몰리는 분포 (zipf 비슷하게)
+        names = list(SIZES)
+        weights = [1 / (rank + 1) for rank in range(len(names))]
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one(name):
+            async with semaphore:
+                start = time.perf_counter()
+                async with registry.use(name) as model:
+                    await run_in_threadpool(model, "텍스트")
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(random.choices(names, weights)[0]) for _ in range(requests)))
+        return latencies
+
+    random.seed(0)
+    print(f"모델 5개 합계 {sum(SIZES.values())} MB")
+    for budget_mb in (4000, 2000, 1500):
+        registry = build_registry(budget_mb)
+        start = time.perf_counter()
+        latencies = asyncio.run(traffic(registry, 2000, 32))
+        elapsed = time.perf_counter() - start
+        stats = registry.stats()
+        loads = sum(m["loads"] for m in stats["models"])
+        hits = sum(m["hits"] for m in stats["models"])
+        latencies.sort()
+        assert stats["used_bytes"] <= registry.budget_bytes
+        print(f"예산 {budget_mb:>4} MB: {elapsed:5.2f}s, 적중률 {1 - loads / hits:6.1%}, 로드 {loads:>3}회, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.1f} ms, 사용 {stats['used_bytes'] // MB} MB")
+
+    # 요청이 계속 들어오는 중에 새 버전으로 교체: 실패 0건, 교체 순간부터 새 버전만 응답해야 함
+    async def hot_swap():
+        registry = build_registry(2000)
+        await registry.preload("sentiment-en-base")
+        versions = []
+        swapped_at = None
+        stop = False
+
+        async def client():
+            while not stop:
+                async with registry.use("sentiment-en-base") as model:
+                    version = await run_in_threadpool(model, "텍스트")
+                versions.append((time.perf_counter(), version))
+
+        async def operator():
+            nonlocal swapped_at, stop
+            await asyncio.sleep(0.2)
+            await registry.swap("sentiment-en-base", "v2")
+            swapped_at = time.perf_counter()
+            await asyncio.sleep(0.2)
+            stop = True
+
+        await asyncio.gather(operator(), *(client() for _ in range(16)))
+        stats = registry.stats()
+        before = sum(1 for _, version in versions if version == "v1")
+        # 교체 직전에 시작된 요청은 v1 로 끝날 수 있으므로 교체 후 10ms 이후만 확인
+        late_v1 = sum(1 for at, version in versions if version == "v1" and at > swapped_at + 0.01)
+        assert late_v1 == 0 and not stats["retired"]
+        print(f"무중단 교체: 요청 {len(versions)}건 (v1 {before}, v2 {len(versions) - before}), 실패 0건, "
+              f"교체 후 v1 응답 {late_v1}건, 이전 버전 사용 중 {len(stats['retired'])}개")
+
+    asyncio.run(hot_swap())
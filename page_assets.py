@@ -0,0 +1,143 @@
+# page_assets.py
+# 정적인 HTML 페이지를 시작할 때 한 번만 읽어서 바이트로 보관하는 모듈
+#
+# 사용법:
+#   pages = PageAssets(Path(__file__).resolve().parent / "templates")   # 실행 위치와 무관하게 파일 기준 경로
+#   pages.add("register_form", "register_form.html")
+#
+#   @app.get("/register-form")
+#   async def show_register_form(request: Request):
+#       return pages.response("register_form", request)
+#
+# - UTF-8 인코딩, gzip/br/zstd 압축, ETag 계산은 시작할 때 한 번만 합니다
+# - 요청마다 미리 만들어 둔 Response 객체를 그대로 돌려주므로 새로 할당하지 않습니다
+# - If-None-Match 가 맞으면 304 응답을 보냅니다
+# - reload=True (개발 모드)이면 파일이 바뀌었을 때만 다시 읽습니다
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from response_compression import CODECS, choose_encoding, compress, _etag_for
+
+
+def dev_mode() -> bool:
+    """APP_ENV=development 일 때만 페이지 핫 리로드 사용"""
+    return os.getenv("APP_ENV", "").lower() == "development"
+
+
+class PageAsset:
+    """미리 인코딩/압축된 페이지 하나"""
+
+    def __init__(self, path: Path, media_type: str = "text/html; charset=utf-8"):
+        self.path = path
+        self.media_type = media_type
+        self.load()
+
+    def load(self):
+        self.mtime = self.path.stat().st_mtime_ns
+        body = self.path.read_text(encoding="utf-8").encode("utf-8")
+        self.etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+        # 인코딩별 응답 객체를 미리 만들어 둡니다 (None 은 압축 없음)
+        self.responses: Dict[Optional[str], Response] = {
+            None: self._build(body, self.etag, None),
+        }
+        self.not_modified: Dict[Optional[str], Response] = {
+            None: Response(status_code=304, headers={"ETag": self.etag, "Vary": "Accept-Encoding"}),
+        }
+        for encoding in CODECS:
+            etag = _etag_for(self.etag.encode(), encoding).decode()
+            self.responses[encoding] = self._build(compress(body, encoding), etag, encoding)
+            self.not_modified[encoding] = Response(
+                status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+        self.size = len(body)
+
+    def _build(self, data: bytes, etag: str, encoding: Optional[str]) -> Response:
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=data, media_type=self.media_type, headers=headers)
+
+    def reload_if_changed(self):
+        if self.path.stat().st_mtime_ns != self.mtime:
+            self.load()
+
+
+class PageAssets:
+    """이름 → PageAsset 모음"""
+
+    def __init__(self, directory: Union[str, Path], reload: Optional[bool] = None):
+        self.directory = Path(directory)
+        self.reload = dev_mode() if reload is None else reload
+        self.assets: Dict[str, PageAsset] = {}
+
+    def add(self, name: str, filename: str) -> PageAsset:
+        asset = PageAsset(self.directory / filename)
+        self.assets[name] = asset
+        return asset
+
+    def response(self, name: str, request: Request) -> Response:
+        asset = self.assets[name]
+        if self.reload:
+            asset.reload_if_changed()
+
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        response = asset.responses[encoding]
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, response.headers["etag"]):
+            return asset.not_modified[encoding]
+        return response
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+# =============================================================================
+# 벤치마크: python page_assets.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import importlib
+    import time
+    import tracemalloc
+
+    from starlette.requests import Request as StarletteRequest
+
+    examples = importlib.import_module("초보자_실습예제")
+    request = StarletteRequest({"type": "http", "headers": [(b"accept-encoding", b"gzip, br")]})
+    repeat = 10000
+
+    def measure(label, func):
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = (time.perf_counter() - start) / repeat * 1e6
+
+        # 요청 한 번에 잡히는 최대 메모리 (해제된 것 포함)
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<34}{elapsed:>10.2f} us/req{peak:>10} B/req")
+
+    # 이전 방식: 요청마다 HTML 문자열로 HTMLResponse 를 만들고 UTF-8 로 인코딩
+    from fastapi.responses import HTMLResponse
+    html = (Path(__file__).resolve().parent / "templates" / "register_form.html").read_text(encoding="utf-8")
+
+    measure("이전: HTMLResponse(content=str)", lambda: HTMLResponse(content=html))
+    measure("이후: pages.response()", lambda: examples.pages.response("register_form", request))
@@ -0,0 +1,106 @@
+# readiness.py
+# 무거운 모델을 서버 시작 후 백그라운드에서 불러오는 도구
+#
+# 사용법:
+#   def load_classifier():
+#       from transformers import pipeline      # 무거운 import 는 불러오는 함수 안에서
+#       return pipeline("sentiment-analysis")
+#
+#   classifier = BackgroundLoader(load_classifier, name="sentiment-analysis")
+#
+#   @asynccontextmanager
+#   async def lifespan(app):
+#       classifier.start()                      # 기다리지 않고 바로 요청을 받기 시작
+#       yield
+#       classifier.clear()
+#
+#   @app.get("/readyz")
+#   async def readyz():
+#       return readiness_response(classifier)
+#
+# - 서버는 모델을 기다리지 않고 바로 포트를 열어 /healthz 같은 가벼운 요청에 답합니다
+# - 모델이 준비되기 전에 get() 을 부르면 503(Retry-After) 오류를 돌려줍니다
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+
+class BackgroundLoader:
+    """load() 를 스레드에서 한 번 실행하고 결과를 보관 (async def 이면 이벤트 루프에서 실행)"""
+
+    def __init__(self, load: Callable[[], Any], name: str = "model"):
+        self.load = load
+        self.name = name
+        self.value: Any = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.load_seconds is not None and self.error is None
+
+    def start(self) -> asyncio.Task:
+        if self._task is None:
+            self.started_at = time.perf_counter()
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def _run(self):
+        try:
+            if inspect.iscoroutinefunction(self.load):
+                self.value = await self.load()
+            else:
+                self.value = await run_in_threadpool(self.load)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        # 취소(CancelledError)되면 여기까지 오지 않으므로 준비 완료로 표시되지 않음
+        self.load_seconds = time.perf_counter() - self.started_at
+
+    async def wait(self):
+        await self.start()
+        return self.get()
+
+    def get(self):
+        """준비된 값 반환 (아직이면 503)"""
+        if self.ready:
+            return self.value
+        if self.error is not None:
+            raise HTTPException(status_code=503, detail=f"{self.name} 모델을 불러오지 못했습니다: {self.error}")
+        raise HTTPException(status_code=503, detail=f"{self.name} 모델을 불러오는 중입니다",
+                            headers={"Retry-After": "5"})
+
+    def clear(self):
+        """불러오기를 취소하고 처음 상태로 되돌림 (다시 start() 할 수 있음)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self.value = None
+        self.error = None
+        self.started_at = None
+        self.load_seconds = None
+
+    def status(self) -> dict:
+        if self.ready:
+            state = "ready"
+        elif self.error is not None:
+            state = "failed"
+        else:
+            state = "loading" if self._task else "not_started"
+        return {"name": self.name, "state": state, "load_seconds": self.load_seconds, "error": self.error}
+
+
+def readiness_response(*loaders: BackgroundLoader) -> JSONResponse:
+    """모든 loader 가 준비되면 200, 아니면 503"""
+    ready = all(loader.ready for loader in loaders)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "models": [loader.status() for loader in loaders]},
+    )
@@ -0,0 +1,343 @@
+# response_compression.py
+# 응답 압축 미들웨어 (gzip / brotli / zstd)
+#
+# 사용법:
+#   from response_compression import CompressionMiddleware
+#   app.add_middleware(CompressionMiddleware, minimum_size=500)
+#
+# - Accept-Encoding 을 보고 zstd > br > gzip 순서로 코덱을 고릅니다 (q 값 우선)
+# - 작은 응답, 이미 압축된 응답(Content-Encoding, 이미지/zip 등)은 건너뜁니다
+# - 큰 응답은 이벤트 루프를 막지 않도록 스레드에서 압축합니다
+# - ETag 나 캐시 가능한 Cache-Control 이 붙은 응답(정적/캐시 응답)만 압축 결과를 LRU 캐시에 보관합니다
+#   (한 번만 나가는 동적 JSON 은 해시도 계산하지 않고, 캐시의 쓸모 있는 항목을 밀어내지도 않음)
+# - brotli(`pip install brotli`), zstd(`pip install zstandard`)는 설치된 경우에만 사용됩니다
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import anyio
+
+try:
+    import brotli
+except ImportError:  # brotli 가 없으면 gzip/zstd 만 사용
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard 가 없으면 gzip/br 만 사용
+    zstandard = None
+
+
+# =============================================================================
+# 1. 코덱
+# =============================================================================
+
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    # mtime=0 으로 고정해야 같은 본문이 항상 같은 바이트로 압축됩니다
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
+def _zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+CODECS: Dict[str, Callable[[bytes, int], bytes]] = {"gzip": _gzip}
+if brotli is not None:
+    CODECS["br"] = _brotli
+if zstandard is not None:
+    CODECS["zstd"] = _zstd
+
+# 같은 q 값이면 압축률이 좋은 쪽을 먼저 고릅니다
+PREFERENCE = ("zstd", "br", "gzip")
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """지정한 인코딩으로 본문 압축"""
+    if level is None:
+        level = DEFAULT_LEVELS[encoding]
+    return CODECS[encoding](data, level)
+
+
+def choose_encoding(accept_encoding: str, available=None) -> Optional[str]:
+    """Accept-Encoding 헤더에서 사용할 인코딩 선택 (없으면 None)"""
+    available = CODECS if available is None else available
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for name in PREFERENCE:
+        if name not in available:
+            continue
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+# =============================================================================
+# 2. 압축 결과 캐시
+# =============================================================================
+
+class CompressionCache:
+    """본문 해시 → 압축 바이트 LRU 캐시 (전체 바이트 수로 용량 제한)"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(body: bytes, encoding: str, level: int) -> Tuple[str, int, bytes]:
+        # 압축 수준이 다른 미들웨어끼리 캐시를 같이 써도 서로의 결과를 돌려주지 않도록 level 도 키에 넣음
+        return encoding, level, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self.size,
+                "hits": self.hits, "misses": self.misses}
+
+
+# 미들웨어 기본 캐시 (여러 앱/미들웨어가 함께 써도 안전)
+shared_cache = CompressionCache()
+
+
+# =============================================================================
+# 3. ASGI 미들웨어
+# =============================================================================
+
+# 다시 압축해도 거의 줄지 않는 콘텐츠 타입
+SKIP_CONTENT_TYPES = (
+    "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/x-gzip",
+    "application/zstd", "application/x-brotli", "application/octet-stream",
+    "text/event-stream",
+)
+
+
+class CompressionMiddleware:
+    """gzip / br / zstd 응답 압축 미들웨어"""
+
+    def __init__(self, app, minimum_size: int = 500, offload_size: int = 64 * 1024,
+                 levels: Optional[dict] = None, cache: Optional[CompressionCache] = shared_cache):
+        self.app = app
+        self.minimum_size = minimum_size  # 이보다 작은 본문은 그대로 전송
+        self.offload_size = offload_size  # 이 이상은 스레드에서 압축
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                if not self._compressible(message["headers"]):
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # 스트리밍 응답은 압축하지 않고 그대로 흘려보냅니다
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) < self.minimum_size:
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = await self._compress(body, encoding, self._cacheable(start_message["headers"]))
+            headers = [(k, v) for k, v in start_message["headers"]
+                       if k not in (b"content-length", b"vary", b"etag")]
+            headers.append((b"content-encoding", encoding.encode()))
+            headers.append((b"content-length", str(len(compressed)).encode()))
+            headers.append((b"vary", self._vary(start_message["headers"])))
+            etag = _header(start_message["headers"], b"etag")
+            if etag is not None:
+                headers.append((b"etag", _etag_for(etag, encoding)))
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible(headers) -> bool:
+        if _header(headers, b"content-encoding") is not None:
+            return False
+        content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+        return not content_type.startswith(SKIP_CONTENT_TYPES)
+
+    @staticmethod
+    def _cacheable(headers) -> bool:
+        """같은 본문이 다시 나갈 응답인지 (ETag 가 있거나 Cache-Control 로 캐시를 허용)"""
+        if _header(headers, b"etag") is not None:
+            return True
+        cache_control = _header(headers, b"cache-control")
+        if cache_control is None:
+            return False
+        directives = {part.strip().partition("=")[0]: part.strip().partition("=")[2]
+                      for part in cache_control.decode("latin-1").lower().split(",")}
+        if directives.keys() & {"no-store", "no-cache", "private"}:
+            return False
+        if "max-age" in directives:
+            return directives["max-age"].strip('"') not in ("", "0")
+        return bool(directives.keys() & {"public", "immutable", "s-maxage"})
+
+    @staticmethod
+    def _vary(headers) -> bytes:
+        vary = _header(headers, b"vary")
+        if not vary:
+            return b"Accept-Encoding"
+        if b"accept-encoding" in vary.lower():
+            return vary
+        return vary + b", Accept-Encoding"
+
+    async def _compress(self, body: bytes, encoding: str, cacheable: bool = False) -> bytes:
+        level = self.levels[encoding]
+        key = None
+        if self.cache is not None and cacheable:
+            key = CompressionCache.key(body, encoding, level)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if len(body) >= self.offload_size:
+            data = await anyio.to_thread.run_sync(compress, body, encoding, level)
+        else:
+            data = compress(body, encoding, level)
+
+        if key is not None:
+            self.cache.put(key, data)
+        return data
+
+
+def _header(headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _etag_for(etag: bytes, encoding: str) -> bytes:
+    """인코딩별로 다른 ETag (강한 ETag 는 표현이 바뀌므로 접미사를 붙임)"""
+    if etag.startswith(b"W/") or not etag.endswith(b'"'):
+        return etag
+    return etag[:-1] + b"-" + encoding.encode() + b'"'
+
+
+# =============================================================================
+# 벤치마크: python response_compression.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import asyncio
+    import importlib
+    import json
+    import time
+
+    # 초보자 실습예제의 큰 응답들을 그대로 측정합니다
+    examples = importlib.import_module("초보자_실습예제")
+    payloads = {
+        "/help": json.dumps(asyncio.run(examples.get_help()), ensure_ascii=False).encode(),
+        "/register-form": examples.pages.assets["register_form"].responses[None].body,
+        "/students x200": json.dumps({"total": 200, "students": [
+            {"id": i, "student": {"name": f"학생{i}", "age": 20, "grade": "대학교",
+                                  "subjects": ["수학", "과학"], "is_active": True},
+             "created_at": "2024-01-01"} for i in range(200)]}, ensure_ascii=False).encode(),
+    }
+    level_table = {"gzip": (1, 6, 9), "br": (1, 4, 11), "zstd": (1, 3, 19)}
+    repeat = 200
+
+    print(f"{'payload':<16}{'codec':<6}{'level':>6}{'bytes':>10}{'ratio':>8}{'us/op':>10}")
+    for name, body in payloads.items():
+        print(f"{name:<16}{'raw':<6}{'-':>6}{len(body):>10}{1:>8.2f}{'-':>10}")
+        for encoding in CODECS:
+            for level in level_table[encoding]:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    data = compress(body, encoding, level)
+                elapsed = (time.perf_counter() - start) / repeat * 1e6
+                print(f"{name:<16}{encoding:<6}{level:>6}{len(data):>10}"
+                      f"{len(data) / len(body):>8.2f}{elapsed:>10.1f}")
+
+    # 캐시 적중 시에는 압축 비용이 해시 비용으로 바뀝니다
+    body = payloads["/register-form"]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        CompressionCache.key(body, "gzip", DEFAULT_LEVELS["gzip"])
+    elapsed = (time.perf_counter() - start) / repeat * 1e6
+    print(f"\n캐시 키 계산(blake2b): {elapsed:.1f} us/op")
@@ -0,0 +1,376 @@
+# search_index.py
+# 상품 검색용 메모리 인덱스 (역색인 + 카테고리 색인 + 가격 정렬 색인)
+#
+# 사용법:
+#   index = ProductIndex()
+#   index.add(1, "사과 주스 1L", "food", 3500)
+#   index.search(q="사과", category="food", min_price=1000, max_price=5000)
+#
+# - 한글은 글자 단위(1-gram)와 두 글자 단위(2-gram)로 쪼개서 "사과"로 "사과주스"도 찾습니다
+# - 영문/숫자는 소문자 단어 단위로 색인합니다
+# - q / category / 가격 조건을 각각 id 집합(posting list)으로 만든 뒤, 작은 것부터 교집합합니다
+# - 가격 조건은 정렬된 (가격, id) 블록 리스트에서 bisect 로 범위를 찾습니다 (전체를 훑지 않음)
+#   블록마다 최대 2000개씩 나눠 두므로 추가/삭제할 때 리스트 전체를 밀고 당기지 않습니다
+# - add / update / remove 로 상품이 바뀔 때마다 색인을 바로 고칩니다
+#   처음에 많이 넣을 때는 add_many() 로 넣으면 가격 정렬을 마지막에 한 번만 합니다
+# - 세 글자 이상 한글 단어만 이름에 실제로 들어 있는지 다시 확인합니다 (나머지는 색인만으로 정확함)
+#   search(with_total=False) 이면 확인을 skip+limit 개를 찾을 때까지만 하고 total 은 None
+# - async 핸들러(이벤트 루프 한 곳)에서 쓰는 것을 가정합니다
+
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+_WORD_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def _is_hangul(word: str) -> bool:
+    return "가" <= word[0] <= "힣"
+
+
+def tokenize(text: str) -> Set[str]:
+    """'사과주스 1L' → {'사', '과', '주', '스', '사과', '과주', '주스', '1l'}"""
+    tokens = set()
+    for word in _WORD_RE.findall(text.lower()):
+        if _is_hangul(word):
+            tokens.update(word)
+            tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.add(word)
+    return tokens
+
+
+class _SortedBlocks:
+    """정렬된 값을 load~2*load 개짜리 블록 리스트로 나눠 보관 (삽입/삭제 시 블록 하나만 옮김)"""
+
+    def __init__(self, values: Iterable[tuple] = (), load: int = 1000):
+        self._load = load
+        self._blocks: List[list] = []
+        self._maxes: List[tuple] = []  # 블록마다 마지막(가장 큰) 값
+        self._len = 0
+        self.reset(values)
+
+    def reset(self, values: Iterable[tuple]):
+        """values 전체를 한 번 정렬해서 다시 만듦 (하나씩 넣는 것보다 훨씬 빠름)"""
+        values = sorted(values)
+        self._blocks = [values[i:i + self._load] for i in range(0, len(values), self._load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(values)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[tuple]:
+        return chain.from_iterable(self._blocks)
+
+    def add(self, value: tuple):
+        self._len += 1
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+            return
+        i = bisect_left(self._maxes, value)
+        if i == len(self._blocks):
+            i -= 1
+            self._blocks[i].append(value)
+            self._maxes[i] = value
+        else:
+            insort(self._blocks[i], value)
+        block = self._blocks[i]
+        if len(block) > 2 * self._load:
+            # 블록이 너무 커지면 반으로 나눔
+            self._blocks.insert(i + 1, block[self._load:])
+            del block[self._load:]
+            self._maxes.insert(i, block[-1])
+
+    def remove(self, value: tuple):
+        i = bisect_left(self._maxes, value)
+        block = self._blocks[i]
+        j = bisect_left(block, value)
+        del block[j]
+        self._len -= 1
+        if not block:
+            del self._blocks[i]
+            del self._maxes[i]
+        elif j == len(block):
+            self._maxes[i] = block[-1]
+
+    def _position(self, key: tuple, right: bool) -> Tuple[int, int]:
+        """(블록 번호, 블록 안 위치) - key 이상(right 이면 key 초과)인 첫 값의 자리"""
+        find = bisect_right if right else bisect_left
+        i = find(self._maxes, key)
+        if i == len(self._blocks):
+            return i, 0
+        return i, find(self._blocks[i], key)
+
+    def _bounds(self, low: tuple, high: tuple):
+        start = self._position(low, right=False)
+        end = self._position(high, right=True)
+        return start, max(start, end)
+
+    def count(self, low: tuple, high: tuple) -> int:
+        """low <= 값 <= high 인 값의 개수"""
+        (i, j), (k, m) = self._bounds(low, high)
+        return sum(len(block) for block in self._blocks[i:k]) - j + m
+
+    def irange(self, low: tuple, high: tuple) -> Iterator[tuple]:
+        """low <= 값 <= high 인 값을 순서대로"""
+        (i, j), (k, m) = self._bounds(low, high)
+        for n in range(i, min(k + 1, len(self._blocks))):
+            block = self._blocks[n]
+            yield from islice(block, j if n == i else 0, m if n == k else len(block))
+
+
+class ProductIndex:
+    """상품 검색 인덱스"""
+
+    def __init__(self):
+        self.products: Dict[int, dict] = {}
+        self._names: Dict[int, str] = {}  # id → 소문자 이름 (검색어 확인용)
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._categories: Dict[str, Set[int]] = defaultdict(set)
+        self._by_price = _SortedBlocks()  # (가격, id) 정렬
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    # -------------------------------------------------------------------------
+    # 색인 수정
+    # -------------------------------------------------------------------------
+
+    def _index(self, product_id: int, name: str, category: Optional[str], price: float) -> dict:
+        """가격 정렬을 뺀 나머지 색인에 추가"""
+        product = {"id": product_id, "name": name, "category": category, "price": price}
+        self.products[product_id] = product
+        self._names[product_id] = name.lower()
+        for token in tokenize(name):
+            self._postings[token].add(product_id)
+        if category is not None:
+            self._categories[category].add(product_id)
+        return product
+
+    def add(self, product_id: int, name: str, category: Optional[str], price: float) -> dict:
+        if product_id in self.products:
+            self.remove(product_id)
+        product = self._index(product_id, name, category, price)
+        self._by_price.add((price, product_id))
+        return product
+
+    def add_many(self, products: Iterable[tuple]) -> int:
+        """(id, 이름, 카테고리, 가격) 여러 개를 한 번에 추가 (가격 정렬은 마지막에 한 번만)"""
+        rows = {row[0]: row for row in products}  # 같은 id 가 여러 번 나오면 마지막 것
+        for product_id in rows:
+            if product_id in self.products:
+                self.remove(product_id)
+        for row in rows.values():
+            self._index(*row)
+        self._by_price.reset(chain(self._by_price, ((price, product_id) for product_id, _, _, price in rows.values())))
+        return len(rows)
+
+    def update(self, product_id: int, name: str, category: Optional[str], price: float) -> Optional[dict]:
+        """있는 상품만 수정 (없는 id 면 None - 새로 만들지 않음)"""
+        if product_id not in self.products:
+            return None
+        return self.add(product_id, name, category, price)
+
+    def remove(self, product_id: int) -> Optional[dict]:
+        product = self.products.pop(product_id, None)
+        if product is None:
+            return None
+        del self._names[product_id]
+        for token in tokenize(product["name"]):
+            ids = self._postings[token]
+            ids.discard(product_id)
+            if not ids:
+                del self._postings[token]
+        if product["category"] is not None:
+            ids = self._categories[product["category"]]
+            ids.discard(product_id)
+            if not ids:
+                del self._categories[product["category"]]
+        self._by_price.remove((product["price"], product_id))
+        return product
+
+    # -------------------------------------------------------------------------
+    # 검색
+    # -------------------------------------------------------------------------
+
+    def _text_ids(self, q: str) -> Optional[Set[int]]:
+        tokens = tokenize(q)
+        if not tokens:
+            return None
+        postings = []
+        for token in tokens:
+            ids = self._postings.get(token)
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def _price_keys(min_price: Optional[float], max_price: Optional[float]) -> Tuple[tuple, tuple]:
+        return ((-math.inf if min_price is None else min_price, -math.inf),
+                (math.inf if max_price is None else max_price, math.inf))
+
+    def search(self, q: Optional[str] = None, category: Optional[str] = None,
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               limit: int = 10, skip: int = 0, with_total: bool = True) -> dict:
+        """조건을 모두 만족하는 상품을 id 순으로 반환 (with_total=False 이면 total 을 세지 않을 수 있음)"""
+        candidate_sets = []
+        if q:
+            text_ids = self._text_ids(q)
+            if text_ids is not None:
+                candidate_sets.append(text_ids)
+        if category is not None:
+            candidate_sets.append(self._categories.get(category, set()))
+
+        has_price = min_price is not None or max_price is not None
+        low, high = self._price_keys(min_price, max_price)
+
+        candidate_sets.sort(key=len)
+        if candidate_sets:
+            candidates = candidate_sets[0]
+            for ids in candidate_sets[1:]:
+                candidates = candidates & ids
+            if has_price:
+                if self._by_price.count(low, high) < len(candidates):
+                    # 가격 범위가 더 작으면 범위의 id 들을 집합으로 만들어 교집합
+                    candidates = candidates & {pid for _, pid in self._by_price.irange(low, high)}
+                else:
+                    # 후보가 더 적으면 후보의 가격만 확인
+                    products = self.products
+                    candidates = {pid for pid in candidates
+                                  if (min_price is None or products[pid]["price"] >= min_price)
+                                  and (max_price is None or products[pid]["price"] <= max_price)}
+        elif has_price:
+            candidates = {pid for _, pid in self._by_price.irange(low, high)}
+        else:
+            candidates = self.products.keys()
+
+        # 영문/숫자 단어와 1~2 글자 한글 단어는 색인 토큰이 곧 이름의 일부라 교집합만으로 정확함
+        # 세 글자 이상 한글 단어는 2-gram 이 이름의 다른 곳에 흩어져 맞았을 수 있으므로 다시 확인
+        words = [word for word in _WORD_RE.findall(q.lower()) if _is_hangul(word) and len(word) > 2] if q else []
+        if words:
+            names = self._names
+            if not with_total:
+                # id 순으로 꺼내면서 확인하고 skip+limit 개를 찾으면 멈춤
+                heap = list(candidates)
+                heapq.heapify(heap)
+                page = []
+                while heap and len(page) < skip + limit:
+                    pid = heapq.heappop(heap)
+                    if all(word in names[pid] for word in words):
+                        page.append(pid)
+                return {"total": None, "items": [self.products[pid] for pid in page[skip:]]}
+            candidates = [pid for pid in candidates if all(word in names[pid] for word in words)]
+
+        total = len(candidates)
+        page = heapq.nsmallest(skip + limit, candidates)[skip:]
+        return {"total": total, "items": [self.products[pid] for pid in page]}
+
+
+# 예제 앱에서 쓰는 기본 상품 목록 (id, 이름, 카테고리, 가격)
+SAMPLE_PRODUCTS = [
+    (1, "삼성 갤럭시 노트북", "electronics", 1290000),
+    (2, "LG 그램 노트북 16", "electronics", 1590000),
+    (3, "애플 아이패드 에어", "electronics", 929000),
+    (4, "무선 블루투스 이어폰", "electronics", 89000),
+    (5, "기모 후드 티셔츠", "clothing", 39000),
+    (6, "데님 청바지", "clothing", 59000),
+    (7, "경량 패딩 점퍼", "clothing", 129000),
+    (8, "파이썬 코딩 도장", "books", 28000),
+    (9, "FastAPI 웹 개발", "books", 32000),
+    (10, "혼자 공부하는 머신러닝", "books", 26000),
+    (11, "사과 주스 1L", "food", 3500),
+    (12, "유기농 사과 3kg", "food", 25000),
+    (13, "제주 감귤 5kg", "food", 19000),
+    (14, "바나나 우유", "food", 1500),
+    (15, "요가 매트", "sports", 22000),
+    (16, "축구공 5호", "sports", 35000),
+    (17, "러닝화 에어", "sports", 99000),
+]
+
+
+def sample_index() -> ProductIndex:
+    index = ProductIndex()
+    index.add_many(SAMPLE_PRODUCTS)
+    return index
+
+
+# =============================================================================
+# 벤치마크: python search_index.py [상품 수]
+# =============================================================================
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    random.seed(0)
+    brands = ["삼성", "엘지", "애플", "나이키", "아디다스", "농심", "오뚜기", "교보", "한빛", "제주"]
+    nouns = ["노트북", "이어폰", "티셔츠", "청바지", "운동화", "라면", "주스", "사과", "소설", "축구공",
+             "모니터", "키보드", "마우스", "자켓", "우유", "과자", "요가매트", "파이썬", "backpack", "camera"]
+    adjectives = ["프리미엄", "가성비", "신상", "한정판", "유기농", "무선", "경량", "대용량", "mini", "pro"]
+    categories = ["electronics", "clothing", "books", "food", "sports"]
+
+    rows = [(product_id,
+             f"{random.choice(brands)} {random.choice(adjectives)} {random.choice(nouns)} {product_id % 1000}",
+             random.choice(categories), random.randint(1000, 2_000_000))
+            for product_id in range(1, n + 1)]
+    index = ProductIndex()
+    start = time.perf_counter()
+    index.add_many(rows)
+    print(f"상품 {n:,}개 색인 (add_many): {time.perf_counter() - start:.1f}s")
+
+    queries = [
+        {"q": "노트북"},
+        {"q": "삼성 노트북"},
+        {"q": "사과", "category": "food"},
+        {"q": "무선 이어폰", "min_price": 10000, "max_price": 50000},
+        {"category": "books", "min_price": 5000, "max_price": 6000},
+        {"min_price": 100000, "max_price": 100500},
+        {"q": "camera pro", "category": "electronics", "max_price": 500000},
+    ]
+    repeat = 20
+    for query in queries:
+        index.search(**query)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = index.search(**query)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        print(f"{elapsed:9.2f} ms  total={result['total']:>8,}  {query}")
+
+    # total 이 필요 없으면 첫 페이지를 찾는 대로 멈춤
+    for query in queries[:2]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = index.search(**query, with_total=False)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        print(f"{elapsed:9.2f} ms  total 생략            {query}")
+
+    # 하나씩 추가 (이미 큰 색인에 더하기)
+    start = time.perf_counter()
+    for product_id in range(n + 1, n + 1001):
+        index.add(product_id, f"새 상품 {product_id}", "food", random.randint(1000, 2_000_000))
+    print(f"추가 1000건: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # 증분 수정
+    start = time.perf_counter()
+    for product_id in range(1, 1001):
+        index.update(product_id, f"수정된 상품 {product_id}", "sports", 5000)
+    print(f"수정 1000건: {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    for product_id in range(1, 1001):
+        index.remove(product_id)
+    print(f"삭제 1000건: {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,248 @@
+# shared_state.py
+# 이벤트 루프(async 핸들러)와 스레드 풀(def 핸들러)이 함께 써도 안전한 전역 상태
+#
+# FastAPI 는 async def 핸들러는 이벤트 루프에서, def 핸들러는 스레드 풀에서 실행합니다.
+# 그래서 전역 변수를 `global x; x += 1` 처럼 고치면 동시에 들어온 요청끼리 값이 꼬일 수 있습니다.
+#
+# - AtomicCell       : 값 하나 + 버전 번호 (읽기는 잠금 없이, 쓰기는 잠금 안에서)
+# - IdAllocator      : 겹치지 않는 id 발급 (student_id_counter 대체)
+# - CopyOnWriteList  : 쓸 때마다 새 튜플을 만들어, 읽는 쪽은 잠금 없이 스냅샷을 봄
+# - SharedIdAllocator: 여러 프로세스(uvicorn --workers)가 공유 메모리로 id 를 나눠 씀 (POSIX 전용)
+
+import itertools
+import struct
+import threading
+from typing import Any, Callable, Generic, Iterable, Optional, Tuple, TypeVar
+
+try:
+    import fcntl
+    from multiprocessing import shared_memory
+except ImportError:  # Windows 에서는 SharedIdAllocator 를 쓸 수 없음
+    fcntl = None
+
+T = TypeVar("T")
+
+
+# =============================================================================
+# 1. 버전이 있는 값 하나
+# =============================================================================
+
+class AtomicCell(Generic[T]):
+    """(버전, 값) 튜플을 통째로 바꿔 끼우는 셀"""
+
+    def __init__(self, value: Optional[T] = None):
+        self._state: Tuple[int, Optional[T]] = (0, value)
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[T]:
+        # 튜플 참조 하나를 읽는 것이므로 잠금 없이도 값과 버전이 항상 짝이 맞습니다
+        return self._state[1]
+
+    def snapshot(self) -> Tuple[int, Optional[T]]:
+        return self._state
+
+    @property
+    def version(self) -> int:
+        return self._state[0]
+
+    def set(self, value: T) -> int:
+        with self._lock:
+            version = self._state[0] + 1
+            self._state = (version, value)
+            return version
+
+    def compare_and_set(self, expected_version: int, value: T) -> bool:
+        """버전이 그대로일 때만 값을 바꿈 (다른 요청이 먼저 바꿨으면 False)"""
+        with self._lock:
+            if self._state[0] != expected_version:
+                return False
+            self._state = (expected_version + 1, value)
+            return True
+
+    def update(self, func: Callable[[Optional[T]], T]) -> T:
+        """현재 값으로 새 값을 계산해서 바꿈 (func 는 짧고 await 없는 함수여야 함)"""
+        with self._lock:
+            version, value = self._state
+            new_value = func(value)
+            self._state = (version + 1, new_value)
+            return new_value
+
+
+# =============================================================================
+# 2. id 발급기
+# =============================================================================
+
+class IdAllocator:
+    """1, 2, 3 ... 처럼 겹치지 않는 id 를 발급"""
+
+    def __init__(self, start: int = 1):
+        self._counter = itertools.count(start)
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            return next(self._counter)
+
+
+class SharedIdAllocator:
+    """프로세스 사이에서 공유되는 id 발급기 (공유 메모리 8바이트 + 파일 잠금)"""
+
+    def __init__(self, name: str, start: int = 1, lock_path: Optional[str] = None):
+        if fcntl is None:
+            raise RuntimeError("SharedIdAllocator 는 POSIX(리눅스/맥)에서만 사용할 수 있습니다")
+        self._lock_file = open(lock_path or f"/tmp/{name}.lock", "a+b")
+        with self._file_lock():
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=8)
+                struct.pack_into("<q", self._shm.buf, 0, start)
+                self.owner = True
+            except FileExistsError:
+                self._shm = shared_memory.SharedMemory(name=name)
+                self.owner = False
+        self._lock = threading.Lock()
+
+    def _file_lock(self):
+        return _FileLock(self._lock_file)
+
+    def next(self) -> int:
+        with self._lock, self._file_lock():
+            value = struct.unpack_from("<q", self._shm.buf, 0)[0]
+            struct.pack_into("<q", self._shm.buf, 0, value + 1)
+            return value
+
+    def close(self, unlink: bool = False):
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+        self._lock_file.close()
+
+
+class _FileLock:
+    def __init__(self, file):
+        self.file = file
+
+    def __enter__(self):
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+
+
+# =============================================================================
+# 3. 쓸 때 복사하는 리스트
+# =============================================================================
+
+class CopyOnWriteList(Generic[T]):
+    """쓰기는 새 튜플로 교체, 읽기는 잠금 없이 스냅샷 튜플을 사용"""
+
+    def __init__(self, items: Iterable[T] = ()):
+        self._items: Tuple[T, ...] = tuple(items)
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Tuple[T, ...]:
+        return self._items
+
+    def append(self, item: T):
+        with self._lock:
+            self._items = self._items + (item,)
+
+    def remove_if(self, predicate: Callable[[T], bool]) -> int:
+        with self._lock:
+            kept = tuple(item for item in self._items if not predicate(item))
+            removed = len(self._items) - len(kept)
+            self._items = kept
+            return removed
+
+    def find(self, predicate: Callable[[T], bool]) -> Optional[T]:
+        for item in self._items:
+            if predicate(item):
+                return item
+        return None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+# =============================================================================
+# 스트레스 테스트: python shared_state.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import asyncio
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    writers, readers, per_writer = 2000, 2000, 5
+    ids = IdAllocator()
+    cell: AtomicCell[Any] = AtomicCell()
+    students: CopyOnWriteList[dict] = CopyOnWriteList()
+    problems = []
+
+    def writer(n):
+        for _ in range(per_writer):
+            student_id = ids.next()
+            students.append({"id": student_id})
+            cell.set({"id": student_id, "writer": n})
+
+    def reader():
+        last_version, last_length = -1, 0
+        for _ in range(per_writer):
+            version, value = cell.snapshot()
+            if version < last_version:
+                problems.append(f"버전이 거꾸로 감: {last_version} -> {version}")
+            if version and value is None:
+                problems.append("버전과 값이 짝이 맞지 않음")
+            last_version = version
+            length = len(students.snapshot())
+            if length < last_length:
+                problems.append(f"스냅샷이 줄어듦: {last_length} -> {length}")
+            last_length = length
+
+    async def main():
+        # 이벤트 루프의 코루틴과 스레드 풀의 작업자가 동시에 읽고 씀
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=64) as pool:
+            tasks = [loop.run_in_executor(pool, writer, n) for n in range(writers // 2)]
+            tasks += [loop.run_in_executor(pool, reader) for _ in range(readers // 2)]
+            tasks += [asyncio.to_thread(writer, n) for n in range(writers // 2, writers)]
+
+            async def async_reader():
+                for _ in range(per_writer):
+                    reader()
+                    await asyncio.sleep(0)
+            tasks += [async_reader() for _ in range(readers // 2)]
+            await asyncio.gather(*tasks)
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+
+    total = writers * per_writer
+    all_ids = [s["id"] for s in students]
+    assert len(all_ids) == total, f"학생 수 불일치: {len(all_ids)} != {total}"
+    assert sorted(all_ids) == list(range(1, total + 1)), "id 가 빠지거나 겹침"
+    assert cell.version == total, f"버전 불일치: {cell.version} != {total}"
+    assert not problems, problems[:5]
+    print(f"작성자 {writers}, 독자 {readers}, 쓰기 {total}회: 문제 없음 ({elapsed:.2f}s)")
+
+    if fcntl is not None:
+        from multiprocessing import Pool
+
+        def _allocate(_):
+            allocator = SharedIdAllocator("shared_state_demo")
+            result = [allocator.next() for _ in range(1000)]
+            allocator.close()
+            return result
+
+        owner = SharedIdAllocator("shared_state_demo")
+        try:
+            with Pool(4) as pool:
+                results = pool.map(_allocate, range(8))
+            allocated = [i for chunk in results for i in chunk]
+            assert len(allocated) == len(set(allocated)) == 8000, "프로세스 사이 id 중복"
+            print("프로세스 8개 x 1000개 id 발급: 중복 없음")
+        finally:
+            owner.close(unlink=True)
@@ -0,0 +1,132 @@
+# single_flight.py
+# 같은 요청이 동시에 여러 번 들어오면 한 번만 계산하고 결과를 나눠 주는 도구 (single-flight)
+#
+# 사용법:
+#   predictions = SingleFlight(max_wait=10)
+#
+#   @app.post("/predict")
+#   async def predict(content: Annotated[str, Form()]):
+#       return await predictions.run(("predict", content), run_model, content)
+#
+# - 처음 들어온 요청(leader)만 func 를 실행하고, 같은 key 로 뒤따라온 요청(follower)은
+#   leader 의 결과를 기다렸다가 그대로 받습니다
+# - func 가 일반 함수(def)이면 스레드 풀에서 실행해 이벤트 루프를 막지 않습니다
+# - follower 는 최대 max_wait 초까지만 기다리고, 넘으면 직접 계산합니다
+# - 결과를 저장해 두는 캐시가 아니므로, 계산이 끝난 뒤 들어온 요청은 다시 계산합니다
+
+import asyncio
+import hashlib
+import inspect
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+
+def request_key(request: Request, body: bytes = b"", include: Iterable[str] = ("method", "path", "query", "body")) -> tuple:
+    """라우트 + 쿼리 + 본문 해시로 key 만들기 (include 로 구성 요소 선택)"""
+    parts = []
+    for name in include:
+        if name == "method":
+            parts.append(request.method)
+        elif name == "path":
+            parts.append(request.url.path)
+        elif name == "query":
+            parts.append(tuple(sorted(request.query_params.multi_items())))
+        elif name == "body":
+            parts.append(hashlib.sha256(body).hexdigest() if body else "")
+        elif name == "host":
+            parts.append(str(request.base_url))
+        else:
+            parts.append(request.headers.get(name))
+    return tuple(parts)
+
+
+class SingleFlight:
+    """key 별로 진행 중인 계산 하나만 유지"""
+
+    def __init__(self, max_wait: Optional[float] = 30.0):
+        self.max_wait = max_wait
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+
+    async def _call(self, func: Callable[..., Any], *args, **kwargs):
+        if inspect.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        result = await run_in_threadpool(func, *args, **kwargs)
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    async def run(self, key: Hashable, func: Callable[..., Any], *args, **kwargs):
+        future = self._inflight.get(key)
+        if future is not None:
+            self.followers += 1
+            try:
+                # shield: follower 가 취소되어도 leader 의 계산은 계속됨
+                return await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                return await self._call(func, *args, **kwargs)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # 이 follower 자신이 취소된 경우
+                # leader 가 취소되었으면 직접 계산
+                return await self._call(func, *args, **kwargs)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.leaders += 1
+        try:
+            result = await self._call(func, *args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 follower 가 없어도 "exception was never retrieved" 경고가 나지 않도록
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "leaders": self.leaders,
+                "followers": self.followers, "timeouts": self.timeouts}
+
+
+# =============================================================================
+# 몰려드는 요청(thundering herd) 테스트: python single_flight.py
+# =============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    def expensive(text: str) -> dict:
+        # 모델 추론 대신 CPU 를 쓰는 계산
+        total = 0
+        for i in range(300_000):
+            total += (i * len(text)) % 7
+        return {"label": "POSITIVE" if total % 2 else "NEGATIVE", "score": total / 1e6}
+
+    async def herd(clients: int, flight: Optional[SingleFlight]):
+        async def one():
+            if flight is None:
+                return await run_in_threadpool(expensive, "오늘 날씨가 좋아요")
+            return await flight.run(("predict", "오늘 날씨가 좋아요"), expensive, "오늘 날씨가 좋아요")
+        return await asyncio.gather(*(one() for _ in range(clients)))
+
+    clients = 200
+    for label, flight in (("single-flight 없음", None), ("single-flight 사용", SingleFlight())):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        results = asyncio.run(herd(clients, flight))
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+        assert all(result == results[0] for result in results)
+        extra = f" {flight.stats()}" if flight else ""
+        print(f"{label}: 동시 요청 {clients}개, CPU {cpu:.2f}s, 경과 {wall:.2f}s{extra}")
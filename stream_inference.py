@@ -0,0 +1,285 @@
+# stream_inference.py
+# 요청을 모아서 한 번에 추론하는 배처 + 웹소켓으로 문장을 연속해서 받는 추론 채널
+#
+# 사용법:
+#   def run_classifier(texts: list) -> list:
+#       return model(texts, batch_size=len(texts))      # 리스트를 한 번에 추론
+#
+#   batcher = MicroBatcher(run_classifier, max_batch=32, max_delay=0.005)
+#
+#   @app.post("/predict")                                 # HTTP 도 같은 배처를 사용
+#   async def predict(content: Annotated[str, Form()]):
+#       return await batcher.submit(content)
+#
+#   @app.websocket("/ws/predict")
+#   async def predict_ws(websocket: WebSocket):
+#       await serve_inference_socket(websocket, batcher.submit, max_in_flight=64)
+#
+# 웹소켓 메시지 형식 (JSON 텍스트 프레임)
+#   보냄: {"id": "클라이언트가 정한 값", "content": "문장"}
+#   받음: {"id": ..., "result": {...}}  또는  {"id": ..., "error": "...", "status": 503}
+#   결과는 끝난 순서대로 오므로 id 로 짝을 맞춥니다
+#
+# - 배처는 첫 요청 후 max_delay 초 동안(또는 max_batch 개가 찰 때까지) 모아서 스레드에서 한 번에 실행합니다
+#   실행 중에 들어온 요청은 다음 배치로 모이므로, 몰릴수록 배치가 커집니다
+#   배치 실행이 실패하면 하나씩 다시 실행해서, 실제로 실패한 요청만 오류를 받습니다
+# - 소켓마다 처리 중인 메시지가 max_in_flight 개가 되면 다음 메시지를 읽지 않습니다
+#   (서버가 읽지 않으면 TCP 흐름 제어로 클라이언트의 전송도 멈춤)
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, List, Optional
+
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+
+
+class MicroBatcher:
+    """submit() 된 값을 모아 func(리스트) 로 한 번에 처리 (결과 리스트는 같은 순서)"""
+
+    def __init__(self, func: Callable[[list], list], max_batch: int = 32, max_delay: float = 0.005):
+        self.func = func
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: list = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if self._worker is None:
+            if len(self._pending) >= self.max_batch or self.max_delay <= 0:
+                self._start()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._start)
+        return await future
+
+    def _start(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._worker is None and self._pending:
+            self._worker = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        try:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                await self._run(batch)
+        finally:
+            self._worker = None
+
+    async def _run(self, batch: list):
+        self.batches += 1
+        self.items += len(batch)
+        self.largest = max(self.largest, len(batch))
+        try:
+            results = await run_in_threadpool(self.func, [item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], error=e)
+            else:
+                # 한 항목 때문에 배치 전체가 실패하지 않도록 하나씩 다시 실행해서 실패한 항목만 오류로 돌려줌
+                await self._run_each(batch)
+            return
+        if len(results) != len(batch):
+            # 개수가 다르면 어느 결과가 어느 요청 것인지 알 수 없으므로 모두 오류로 (기다리는 요청이 남지 않도록)
+            error = RuntimeError(f"배치 함수가 {len(batch)}개 입력에 {len(results)}개 결과를 돌려주었습니다")
+            for _, future in batch:
+                self._resolve(future, error=error)
+            return
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, result)
+
+    async def _run_each(self, batch: list):
+        for item, future in batch:
+            if future.done():
+                continue
+            try:
+                result = (await run_in_threadpool(self.func, [item]))[0]
+            except Exception as e:
+                self._resolve(future, error=e)
+            else:
+                self._resolve(future, result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any = None, error: Optional[Exception] = None):
+        if future.done():  # 기다리던 요청이 이미 취소되었으면 건너뜀
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "items": self.items, "largest": self.largest,
+                "average": round(self.items / self.batches, 2) if self.batches else 0,
+                "pending": len(self._pending)}
+
+
+async def serve_inference_socket(websocket: WebSocket, handle: Callable[[str], Awaitable[Any]],
+                                 max_in_flight: int = 64):
+    """메시지마다 handle(content) 를 동시에 실행하고, 끝나는 대로 결과를 보냄"""
+    await websocket.accept()
+    slots = asyncio.Semaphore(max_in_flight)
+    send_lock = asyncio.Lock()
+    tasks: set = set()
+
+    async def send(payload: dict):
+        async with send_lock:
+            await websocket.send_text(json.dumps(payload, ensure_ascii=False))
+
+    async def answer(message_id, content: str):
+        try:
+            payload = {"id": message_id, "result": await handle(content)}
+        except HTTPException as e:
+            payload = {"id": message_id, "error": e.detail, "status": e.status_code}
+        except Exception as e:
+            payload = {"id": message_id, "error": f"{type(e).__name__}: {e}", "status": 500}
+        try:
+            await send(payload)
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()  # 처리 중인 메시지가 가득 차면 여기서 기다림
+            message = None
+            try:
+                message = json.loads(await websocket.receive_text())
+                content = message["content"]
+                if not isinstance(content, str):
+                    raise TypeError
+            except (ValueError, KeyError, TypeError):
+                slots.release()
+                await send({"id": message.get("id") if isinstance(message, dict) else None,
+                            "error": '{"id": ..., "content": "문장"} 형식이어야 합니다', "status": 422})
+                continue
+            task = asyncio.create_task(answer(message.get("id"), content))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# =============================================================================
+# 벤치마크: python stream_inference.py  (uvicorn + websockets 필요)
+# 웹소켓 하나로 보내기 vs HTTP POST(폼) 반복
+# =============================================================================
+
+if __name__ == "__main__":
+    import multiprocessing
+    import socket
+    import time
+    from typing import Annotated
+
+    import httpx
+    import uvicorn
+    from fastapi import FastAPI, Form
+
+    try:
+        import websockets
+    except ImportError:
+        websockets = None
+
+    def fake_classifier(texts: List[str]) -> list:
+        # 모델 호출 한 번에 고정 비용 2ms + 문장당 0.1ms (배치가 클수록 유리한 실제 모델과 비슷)
+        time.sleep(0.002 + 0.0001 * len(texts))
+        return [{"label": "POSITIVE" if len(text) % 2 else "NEGATIVE", "score": 0.99} for text in texts]
+
+    def serve(port: int):
+        # 클라이언트와 GIL 을 나눠 쓰지 않도록 서버는 별도 프로세스에서 실행
+        app = FastAPI()
+        batcher = MicroBatcher(fake_classifier, max_batch=64, max_delay=0.002)
+
+        @app.post("/predict")
+        async def predict(content: Annotated[str, Form()]):
+            return await batcher.submit(content)
+
+        @app.websocket("/ws/predict")
+        async def predict_ws(websocket: WebSocket):
+            await serve_inference_socket(websocket, batcher.submit, max_in_flight=256)
+
+        @app.get("/stats")
+        async def stats():
+            return batcher.stats()
+
+        uvicorn.run(app, port=port, log_level="warning", access_log=False)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    server = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    while True:
+        try:
+            httpx.get(base_url + "/stats")
+            break
+        except httpx.TransportError:
+            time.sleep(0.05)
+
+    total = 5000
+
+    async def http_sequential() -> float:
+        # 클라이언트 앱처럼 keep-alive 연결 하나로 한 건씩 보냄
+        with httpx.Client(base_url=base_url) as client:
+            start = time.perf_counter()
+            for i in range(total):
+                client.post("/predict", data={"content": f"문장 {i}"}).raise_for_status()
+            return time.perf_counter() - start
+
+    async def http_concurrent(concurrency: int) -> float:
+        # httpx 비동기 클라이언트는 동시 요청이 많을수록 클라이언트 자체가 느려지므로
+        # 이 수치에는 서버보다 클라이언트 쪽 HTTP 비용이 더 많이 들어 있음
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            async def one(i):
+                async with semaphore:
+                    response = await client.post("/predict", data={"content": f"문장 {i}"})
+                    response.raise_for_status()
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(total)))
+            return time.perf_counter() - start
+
+    async def one_socket() -> float:
+        async with websockets.connect(f"ws://127.0.0.1:{port}/ws/predict") as ws:
+            received = set()
+
+            async def reader():
+                while len(received) < total:
+                    received.add(json.loads(await ws.recv())["id"])
+
+            start = time.perf_counter()
+            reading = asyncio.create_task(reader())
+            for i in range(total):
+                await ws.send(json.dumps({"id": i, "content": f"문장 {i}"}, ensure_ascii=False))
+            await reading
+            assert received == set(range(total))
+            return time.perf_counter() - start
+
+    try:
+        runs = [("HTTP POST 순차 (keep-alive)", http_sequential),
+                ("HTTP POST 동시 32", lambda: http_concurrent(32))]
+        if websockets is not None:
+            runs.append(("웹소켓 1개 (in-flight 256)", one_socket))
+        else:
+            print("websockets 가 없어 웹소켓 측정은 건너뜁니다 (pip install websockets)")
+        for label, run in runs:
+            before = httpx.get(base_url + "/stats").json()
+            elapsed = asyncio.run(run())
+            after = httpx.get(base_url + "/stats").json()
+            batches = after["batches"] - before["batches"]
+            average = (after["items"] - before["items"]) / batches if batches else 1
+            print(f"{label:<24}: {total / elapsed:7.0f} msg/s ({elapsed:5.2f}s), 평균 배치 {average:5.1f}")
+    finally:
+        server.terminate()
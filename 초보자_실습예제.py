@@ -1,13 +1,22 @@
 # 🚀 FastAPI 초보자 실습 예제
 # 이 파일은 단계별로 따라하면서 FastAPI를 배울 수 있는 완전한 예제입니다.
 
-from fastapi import FastAPI, HTTPException, Request, Form
+from fastapi import FastAPI, HTTPException, Request, Form, Depends, Query
 from fastapi.responses import HTMLResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import Optional, List
+from pathlib import Path
 import uvicorn
 
+from response_compression import CompressionMiddleware
+from page_assets import PageAssets
+from shared_state import CopyOnWriteList, IdAllocator
+from fast_validation import build_response, json_body, json_body_openapi, model_response
+from search_index import sample_index
+from batch_calculator import batch_openapi, calculate_binary, calculate_json
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="🎓 FastAPI 초보자 실습",
@@ -15,6 +24,15 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# 큰 응답(/help, /students, /register-form)은 gzip/br/zstd 로 압축해서 보냅니다
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+# 고정된 HTML 페이지는 시작할 때 한 번만 읽고 압축해 둡니다
+# (APP_ENV=development 이면 파일을 고칠 때마다 다시 읽습니다)
+pages = PageAssets(Path(__file__).resolve().parent / "templates")
+pages.add("greeting", "greeting.html")
+pages.add("register_form", "register_form.html")
+
 # ============================================================================
 # 📚 1단계: 기본 응답 타입들 (딕셔너리, 리스트, HTML, 숫자)
 # ============================================================================
@@ -33,18 +51,10 @@ async def get_fruits():
     """과일 목록 - 리스트 반환"""
     return ["🍎 사과", "🍌 바나나", "🍊 오렌지", "🍇 포도", "🥝 키위"]
 
-@app.get("/greeting")
-async def greeting_html():
-    """HTML 인사말 - HTML 반환"""
-    return HTMLResponse(content="""
-    <html>
-        <body style='font-family: Arial; text-align: center; margin: 50px;'>
-            <h1 style='color: #4CAF50;'>🌟 안녕하세요!</h1>
-            <p>FastAPI로 만든 첫 번째 HTML 페이지입니다.</p>
-            <a href='/docs'>📖 API 문서 보기</a>
-        </body>
-    </html>
-    """)
+@app.get("/greeting", response_class=HTMLResponse)
+async def greeting_html(request: Request):
+    """HTML 인사말 - HTML 반환 (templates/greeting.html)"""
+    return pages.response("greeting", request)
 
 @app.get("/visitor-count")
 async def visitor_count():
@@ -87,22 +97,24 @@ async def get_file_info(file_path: str):
 # 📚 3단계: 쿼리 매개변수 (Query Parameters)
 # ============================================================================
 
+# 검색할 상품 목록 (메모리 인덱스)
+product_index = sample_index()
+
 @app.get("/search")
-async def search_items(q: str = None, limit: int = 10, skip: int = 0):
+async def search_items(q: str = None, limit: int = Query(10, ge=0), skip: int = Query(0, ge=0)):
     """검색 API - 쿼리 매개변수"""
     if not q:
         return {
             "message": "검색어를 입력하세요",
-            "example": "/search?q=FastAPI&limit=5&skip=0"
+            "example": "/search?q=노트북&limit=5&skip=0"
         }
     
-    # 가짜 검색 결과
-    fake_results = [f"{q} 관련 결과 {i+1}" for i in range(limit)]
+    found = product_index.search(q=q, limit=limit, skip=skip)
     
     return {
         "query": q,
-        "results": fake_results,
-        "total": len(fake_results),
+        "results": found["items"],
+        "total": found["total"],
         "skip": skip,
         "limit": limit
     }
@@ -144,49 +156,55 @@ class StudentResponse(BaseModel):
     message: str
 
 # 가짜 데이터베이스
-students_db = []
-student_id_counter = 1
+# 여러 요청이 동시에 등록해도 id 가 겹치지 않도록 IdAllocator 를 사용하고,
+# 조회하는 쪽은 잠금 없이 CopyOnWriteList 의 스냅샷을 읽습니다
+students_db = CopyOnWriteList()
+student_ids = IdAllocator(start=1)
 
-@app.post("/students", response_model=StudentResponse)
-async def create_student(student: Student):
-    """학생 등록 - POST 요청과 Pydantic 모델"""
-    global student_id_counter
-    
+@app.post("/students", response_model=StudentResponse, openapi_extra=json_body_openapi(Student))
+async def create_student(student: Student = Depends(json_body(Student))):
+    """학생 등록 - POST 요청과 Pydantic 모델
+
+    본문 JSON 바이트를 dict 를 거치지 않고 바로 Student 로 검증하고("20" 같은 값은 기존처럼 변환),
+    이미 검증된 student 로 응답을 만들 때는 다시 검증하지 않습니다.
+    """
     # 데이터 검증 (나이 체크)
     if student.age < 5 or student.age > 100:
         raise HTTPException(status_code=400, detail="나이는 5세에서 100세 사이여야 합니다")
     
     # 학생 저장
+    student_id = student_ids.next()
     student_data = {
-        "id": student_id_counter,
+        "id": student_id,
         "student": student,
         "created_at": "2024-01-01"
     }
     students_db.append(student_data)
     
-    response = StudentResponse(
-        id=student_id_counter,
+    response = build_response(
+        StudentResponse,
+        id=student_id,
         student=student,
         message=f"{student.name} 학생이 성공적으로 등록되었습니다!"
     )
     
-    student_id_counter += 1
-    return response
+    return model_response(response)
 
 @app.get("/students")
 async def get_all_students():
     """모든 학생 조회"""
+    students = students_db.snapshot()
     return {
-        "total": len(students_db),
-        "students": students_db
+        "total": len(students),
+        "students": students
     }
 
 @app.get("/students/{student_id}")
 async def get_student(student_id: int):
     """특정 학생 조회"""
-    for student_data in students_db:
-        if student_data["id"] == student_id:
-            return student_data
+    student_data = students_db.find(lambda data: data["id"] == student_id)
+    if student_data is not None:
+        return student_data
     
     raise HTTPException(status_code=404, detail="학생을 찾을 수 없습니다")
 
@@ -195,103 +213,9 @@ async def get_student(student_id: int):
 # ============================================================================
 
 @app.get("/register-form", response_class=HTMLResponse)
-async def show_register_form():
-    """학생 등록 폼 페이지"""
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>학생 등록</title>
-        <style>
-            body { font-family: Arial, sans-serif; max-width: 600px; margin: 50px auto; padding: 20px; }
-            .form-group { margin-bottom: 15px; }
-            label { display: block; margin-bottom: 5px; font-weight: bold; }
-            input, select { width: 100%; padding: 8px; border: 1px solid #ddd; border-radius: 4px; }
-            button { background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer; }
-            button:hover { background-color: #45a049; }
-            .result { margin-top: 20px; padding: 10px; background-color: #f0f0f0; border-radius: 4px; }
-        </style>
-    </head>
-    <body>
-        <h1>🎓 학생 등록 시스템</h1>
-        
-        <form id="studentForm">
-            <div class="form-group">
-                <label for="name">이름:</label>
-                <input type="text" id="name" name="name" required>
-            </div>
-            
-            <div class="form-group">
-                <label for="age">나이:</label>
-                <input type="number" id="age" name="age" min="5" max="100" required>
-            </div>
-            
-            <div class="form-group">
-                <label for="grade">학년:</label>
-                <select id="grade" name="grade" required>
-                    <option value="">선택하세요</option>
-                    <option value="초등학교">초등학교</option>
-                    <option value="중학교">중학교</option>
-                    <option value="고등학교">고등학교</option>
-                    <option value="대학교">대학교</option>
-                </select>
-            </div>
-            
-            <button type="submit">등록하기</button>
-        </form>
-        
-        <div id="result" class="result" style="display: none;"></div>
-        
-        <hr>
-        <p><a href="/docs">📖 API 문서 보기</a> | <a href="/students">👥 등록된 학생 보기</a></p>
-        
-        <script>
-            document.getElementById('studentForm').addEventListener('submit', async function(e) {
-                e.preventDefault();
-                
-                const formData = new FormData(e.target);
-                const studentData = {
-                    name: formData.get('name'),
-                    age: parseInt(formData.get('age')),
-                    grade: formData.get('grade'),
-                    subjects: [],
-                    is_active: true
-                };
-                
-                try {
-                    const response = await fetch('/students', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json',
-                        },
-                        body: JSON.stringify(studentData)
-                    });
-                    
-                    const result = await response.json();
-                    
-                    if (response.ok) {
-                        document.getElementById('result').innerHTML = 
-                            '<h3 style="color: green;">✅ ' + result.message + '</h3>' +
-                            '<p>학생 ID: ' + result.id + '</p>';
-                        document.getElementById('result').style.display = 'block';
-                        e.target.reset();
-                    } else {
-                        document.getElementById('result').innerHTML = 
-                            '<h3 style="color: red;">❌ 오류: ' + result.detail + '</h3>';
-                        document.getElementById('result').style.display = 'block';
-                    }
-                } catch (error) {
-                    document.getElementById('result').innerHTML = 
-                        '<h3 style="color: red;">❌ 네트워크 오류가 발생했습니다.</h3>';
-                    document.getElementById('result').style.display = 'block';
-                }
-            });
-        </script>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
+async def show_register_form(request: Request):
+    """학생 등록 폼 페이지 (templates/register_form.html)"""
+    return pages.response("register_form", request)
 
 # ============================================================================
 # 📚 6단계: 에러 처리와 상태 코드
@@ -362,6 +286,20 @@ async def calculator(a: float, b: float, operation: str = "add"):
         "result": operations[operation]
     }
 
+@app.post("/calculator/batch", openapi_extra=batch_openapi())
+async def calculator_batch(request: Request, operation: Optional[str] = None):
+    """일괄 계산기 API - 여러 계산을 NumPy 로 한 번에 처리
+
+    JSON({"a": [...], "b": [...], "operation": "add" 또는 [...]}) 또는
+    바이너리(float64 little-endian a, b 배열 + 연산 코드) 본문을 받습니다.
+    0으로 나눈 자리는 /divide 처럼 "0으로 나눌 수 없습니다!" 오류로 표시합니다.
+    """
+    body = await request.body()
+    # 100만 건이면 계산 + 직렬화에 수백 ms 가 걸리므로 이벤트 루프를 막지 않도록 스레드에서 실행
+    if request.headers.get("content-type", "").startswith("application/octet-stream"):
+        return await run_in_threadpool(calculate_binary, body, operation)
+    return await run_in_threadpool(calculate_json, body)
+
 # ============================================================================
 # 📚 8단계: 도움말과 가이드
 # ============================================================================
@@ -377,7 +315,7 @@ async def get_help():
             "4단계": "학생 등록 API를 사용해보세요 (POST /students)",
             "5단계": "웹 폼을 사용해보세요 (/register-form)",
             "6단계": "에러 처리를 확인해보세요 (/divide/10/0)",
-            "7단계": "실용적인 API들을 사용해보세요 (/random-quote, /calculator)"
+            "7단계": "실용적인 API들을 사용해보세요 (/random-quote, /calculator, POST /calculator/batch)"
         },
         "📖 문서": "http://localhost:8000/docs",
         "🎮 테스트 페이지": "http://localhost:8000/register-form",